@@ -0,0 +1,73 @@
+import tkinter.font as tkfont
+
+# One timer for every animation in the app. A tween is a generator that
+# changes a widget a little and then yields; the Timeline steps all running
+# tweens from a single master.after() chain and stops ticking when none are
+# left. Starting a tween under a name that is already playing replaces it.
+
+FRAME_MS = 50
+
+
+class Timeline:
+    def __init__(self, master, interval=FRAME_MS):
+        self.master = master
+        self.interval = interval
+        self.tweens = {}  # name -> generator
+        self.after_id = None
+
+    def play(self, name, tween):
+        self.tweens[name] = tween
+        self.step(name, tween)  # First frame straight away, like the old direct calls
+        if self.after_id is None and self.tweens:
+            self.after_id = self.master.after(self.interval, self.tick)
+
+    def stop(self, name):
+        self.tweens.pop(name, None)
+
+    def stop_all(self):
+        self.tweens.clear()
+        if self.after_id is not None:
+            self.master.after_cancel(self.after_id)
+            self.after_id = None
+
+    def is_playing(self, name):
+        return name in self.tweens
+
+    # Advance one tween, dropping it when it finishes
+    def step(self, name, tween):
+        try:
+            next(tween)
+        except StopIteration:
+            if self.tweens.get(name) is tween:
+                del self.tweens[name]
+
+    def tick(self):
+        self.after_id = None
+        for name, tween in list(self.tweens.items()):
+            self.step(name, tween)
+        if self.tweens:
+            self.after_id = self.master.after(self.interval, self.tick)
+
+
+# Font objects for base_size, base_size + 1, ... base_size + steps, made once and reused every pulse
+def pulse_fonts(family, base_size, steps, **options):
+    return [tkfont.Font(family=family, size=base_size + step, **options) for step in range(steps + 1)]
+
+
+# Grow the label's font one size per frame up to fonts[-1], shrink back, then rest on fonts[0]
+def font_pulse(label, fonts):
+    top = len(fonts) - 1
+    for step in range(top):
+        label.config(font=fonts[step])
+        yield
+    for step in range(top, 0, -1):
+        label.config(font=fonts[step])
+        yield
+    label.config(font=fonts[0])
+
+
+# Reveal text one character per frame
+def typewriter(label, text):
+    for i in range(1, len(text) + 1):
+        label.config(text=text[:i])  # Slice by index rather than appending to the label's current text
+        yield
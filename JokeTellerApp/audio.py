@@ -0,0 +1,140 @@
+import os
+import sys
+import threading
+
+# Sound effects that work on any platform. Each backend loads a sample into
+# memory once (load) and plays it without blocking the GUI (play). Longer
+# clips such as spoken jokes are played straight from their file on a
+# separate voice channel (play_voice), so clicks never queue behind them,
+# and can be cut off (stop_voice).
+# open_audio() picks the first backend that works - winsound on Windows,
+# then pygame, then a silent NullBackend - so the app starts everywhere.
+# Set JOKE_AUDIO=winsound|pygame|null to force one.
+
+
+class NullBackend:
+    """No sound at all (no audio library, or tests)."""
+    name = 'null'
+
+    def load(self, key, path):
+        return False
+
+    def play(self, key):
+        pass
+
+    def play_voice(self, path):
+        pass
+
+    def stop_voice(self):
+        pass
+
+
+class WinsoundBackend:
+    """Windows winsound, playing in-memory WAV data on a worker thread."""
+    name = 'winsound'
+
+    def __init__(self):
+        import winsound
+        self.winsound = winsound
+        self.samples = {}
+        self.pending = None  # Newest sound asked for and not started yet; older ones are dropped
+        self.wanted = threading.Event()
+        self.speaking = False  # Whether the last sound started was the voice, so stop_voice leaves clicks alone
+        threading.Thread(target=self.worker, daemon=True).start()
+
+    def load(self, key, path):
+        with open(path, 'rb') as f:
+            self.samples[key] = f.read()
+        return True
+
+    def play(self, key):
+        if key in self.samples:
+            self.pending = key
+            self.wanted.set()
+
+    # winsound plays one sound at a time, so a click (or stop_voice) cuts off the voice clip playing
+    def play_voice(self, path):
+        try:
+            self.winsound.PlaySound(path, self.winsound.SND_FILENAME | self.winsound.SND_ASYNC |
+                                    self.winsound.SND_NODEFAULT)
+            self.speaking = True
+        except RuntimeError:
+            pass
+
+    def stop_voice(self):
+        if self.speaking:
+            self.speaking = False
+            self.winsound.PlaySound(None, 0)
+
+    # winsound can't play from memory asynchronously, so this thread plays them. Clicks made while
+    # one is playing collapse into a single next click instead of queueing up one per press.
+    def worker(self):
+        while True:
+            self.wanted.wait()
+            self.wanted.clear()
+            key, self.pending = self.pending, None
+            if key is None:
+                continue
+            self.speaking = False
+            try:
+                self.winsound.PlaySound(self.samples[key], self.winsound.SND_MEMORY | self.winsound.SND_NODEFAULT)
+            except RuntimeError:
+                pass
+
+
+class PygameBackend:
+    """pygame.mixer, which already plays sounds asynchronously."""
+    name = 'pygame'
+
+    def __init__(self):
+        import pygame
+        pygame.mixer.init()
+        pygame.mixer.set_reserved(1)  # Channel 0 is kept for the voice, sound effects use the others
+        self.pygame = pygame
+        self.samples = {}
+        self.voice = pygame.mixer.Channel(0)
+
+    def load(self, key, path):
+        self.samples[key] = self.pygame.mixer.Sound(path)
+        return True
+
+    def play(self, key):
+        sound = self.samples.get(key)
+        if sound is not None:
+            sound.play()
+
+    def play_voice(self, path):
+        self.voice.play(self.pygame.mixer.Sound(path))  # Replaces whatever the voice was saying
+
+    def stop_voice(self):
+        self.voice.stop()
+
+
+BACKENDS = {'winsound': WinsoundBackend, 'pygame': PygameBackend, 'null': NullBackend}
+
+
+# The first backend that can be created, in platform order (or the one named in JOKE_AUDIO)
+def open_audio(preferred=None):
+    preferred = preferred or os.environ.get('JOKE_AUDIO')
+    if preferred:
+        order = [preferred]
+    elif sys.platform == 'win32':
+        order = ['winsound', 'pygame']
+    else:
+        order = ['pygame']
+    for name in order:
+        try:
+            return BACKENDS[name]()
+        except Exception:
+            continue  # Not installed or no audio device, try the next one
+    return NullBackend()
+
+
+# Load a sample if the file is there, returns False (and stays silent) otherwise
+def load_sample(audio, key, path):
+    if not os.path.exists(path):
+        return False
+    try:
+        return audio.load(key, path)
+    except Exception:
+        return False
@@ -0,0 +1,73 @@
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from joke_cache import compile_jokes, open_compiled
+from joke_store import JokeIndex, SEED_JOKES, parse_joke
+
+# Startup benchmark: how long it takes before the first joke can be shown,
+# for corpora of different sizes, using
+#   parse    - the original load_jokes (read every line, split on '?')
+#   index    - JokeIndex built from scratch (scan for line offsets)
+#   compile  - building the compiled cache (first launch after a change)
+#   cached   - opening the memory-mapped compiled cache (every other launch)
+#
+# Usage: python bench_joke_cache.py [size ...]   (default 1000 10000 100000 1000000)
+
+
+def old_load_jokes(path):
+    jokes = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            joke = parse_joke(line)
+            if joke:
+                jokes.append(joke)
+    return jokes
+
+
+def make_corpus(path, size):
+    lines = SEED_JOKES.splitlines()
+    rng = random.Random(size)
+    with open(path, 'w', encoding='utf-8') as f:
+        for n in range(size):
+            f.write(f"{rng.choice(lines)} #{n}\n")  # Numbered so every line is different
+
+
+# Best of `repeat` runs, in milliseconds, of load() followed by reading one random joke
+def best_time(load, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        jokes = load()
+        jokes[random.randrange(len(jokes))]
+        elapsed = (time.perf_counter() - start) * 1000
+        if hasattr(jokes, 'close'):
+            jokes.close()
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(sizes):
+    folder = tempfile.mkdtemp(prefix='jokebench')
+    try:
+        print(f"{'jokes':>10} {'MB':>7} {'parse ms':>10} {'index ms':>10} {'compile ms':>11} {'cached ms':>10}")
+        for size in sizes:
+            path = os.path.join(folder, f'jokes{size}.txt')
+            make_corpus(path, size)
+            mb = os.path.getsize(path) / 1e6
+            parse = best_time(lambda: old_load_jokes(path))
+            index = best_time(lambda: JokeIndex(path))
+            start = time.perf_counter()
+            compile_jokes(path)
+            compile_ms = (time.perf_counter() - start) * 1000
+            cached = best_time(lambda: open_compiled(path), repeat=5)
+            print(f"{size:>10} {mb:>7.1f} {parse:>10.1f} {index:>10.1f} {compile_ms:>11.1f} {cached:>10.3f}")
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or [1000, 10000, 100000, 1000000])
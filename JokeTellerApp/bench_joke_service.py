@@ -0,0 +1,131 @@
+import argparse
+import asyncio
+import http.client
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+import uuid
+
+from bench_joke_cache import make_corpus
+from joke_service import JokeService, start_server
+
+# Load test for joke_service.py: `clients` threads, each with its own
+# connection, send a mix of /next, /random and /search requests and the
+# script reports requests per second and latency percentiles.
+#
+# By default it starts a service on a free localhost port with a generated
+# corpus; pass --url to test a service that is already running.
+#
+# Usage: python bench_joke_service.py [--clients N] [--requests N] [--jokes N]
+#                                     [--no-keepalive] [--url host:port]
+
+QUERIES = ['chicken', 'cow', 'scientists', 'pizza', 'why', 'skeleton', 'developer']
+
+
+# Start a JokeService on an event loop in a background thread, returns the port it listens on
+def start_local_service(sources):
+    service = JokeService(sources)
+    started = threading.Event()
+    ports = []
+
+    def run():
+        async def go():
+            server = await start_server(service, '127.0.0.1', 0)
+            ports.append(server.sockets[0].getsockname()[1])
+            started.set()
+            await server.serve_forever()
+        asyncio.run(go())
+
+    threading.Thread(target=run, daemon=True).start()
+    started.wait()
+    return ports[0]
+
+
+def client_paths(count, rng):
+    client = uuid.uuid4().hex
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.6:
+            yield f'/next?client={client}&count=1'
+        elif kind < 0.85:
+            yield '/random'
+        else:
+            yield f'/search?q={rng.choice(QUERIES)}&limit=10'
+
+
+# One client's requests; latencies (ms) go into `latencies`
+def run_client(host, port, count, keep_alive, latencies, seed):
+    rng = random.Random(seed)
+    connection = None
+    mine = []
+    for path in client_paths(count, rng):
+        start = time.perf_counter()
+        if connection is None:
+            connection = http.client.HTTPConnection(host, port, timeout=10)
+        connection.request('GET', path, headers={} if keep_alive else {'Connection': 'close'})
+        reply = connection.getresponse()
+        reply.read()
+        if reply.status != 200:
+            raise RuntimeError(f"{reply.status} for {path}")
+        if not keep_alive:
+            connection.close()
+            connection = None
+        mine.append((time.perf_counter() - start) * 1000)
+    if connection is not None:
+        connection.close()
+    latencies.extend(mine)
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the joke service.")
+    parser.add_argument('--url', help="host:port of a running service (default: start one here)")
+    parser.add_argument('--clients', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=500, help="requests per client")
+    parser.add_argument('--jokes', type=int, default=100000, help="corpus size for the local service")
+    parser.add_argument('--no-keepalive', action='store_true', help="open a new connection per request")
+    args = parser.parse_args()
+
+    folder = None
+    try:
+        if args.url:
+            host, _, port = args.url.rpartition('//')[2].partition(':')
+            port = int(port or 80)
+        else:
+            folder = tempfile.mkdtemp(prefix='jokeservice')
+            path = os.path.join(folder, 'jokes.txt')
+            make_corpus(path, args.jokes)
+            host, port = '127.0.0.1', start_local_service([path])
+
+        latencies = []
+        threads = [threading.Thread(target=run_client,
+                                    args=(host, port, args.requests, not args.no_keepalive, latencies, n))
+                   for n in range(args.clients)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        latencies.sort()
+        print(f"{len(latencies)} requests from {args.clients} clients in {elapsed:.2f}s "
+              f"({'new connection each' if args.no_keepalive else 'keep-alive'})")
+        print(f"  {len(latencies) / elapsed:,.0f} requests/s")
+        print(f"  latency ms: mean {statistics.mean(latencies):.2f}  p50 {percentile(latencies, 0.5):.2f}  "
+              f"p95 {percentile(latencies, 0.95):.2f}  p99 {percentile(latencies, 0.99):.2f}  "
+              f"max {latencies[-1]:.2f}")
+    finally:
+        if folder:
+            shutil.rmtree(folder)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import mmap
+import os
+import struct
+from array import array
+
+from joke_store import CACHE_DIR, joke_tags, parse_joke
+
+# Compiled joke cache. A joke text file is compiled once into a binary file:
+#
+#   header   magic, version, source mtime_ns, source size, joke count
+#   offsets  count + 1 unsigned 64-bit positions of each record (native byte
+#            order - the cache lives next to the source and isn't shared)
+#   records  setup (with its '?') + b'\0' + punchline + b'\0' + tags, UTF-8
+#
+# Later runs memory-map the compiled file, so opening it costs the same for
+# 20 jokes or 20 million: nothing is read or parsed until a joke is asked
+# for, and then only that record. The cache is rebuilt automatically when
+# the source file's mtime or size changes.
+
+MAGIC = b'JOKC'
+VERSION = 3  # Bumped when the record layout or parse_joke changes
+HEADER = struct.Struct('<4sIqqq')  # magic, version, mtime_ns, size, count (32 bytes, keeps offsets aligned)
+
+
+def compiled_path(source):
+    folder, name = os.path.split(os.path.abspath(source))
+    return os.path.join(folder, CACHE_DIR, name + '.jokc')
+
+
+# Build the compiled cache for a joke file, returns the number of jokes
+def compile_jokes(source, target=None):
+    target = target or compiled_path(source)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    st = os.stat(source)
+    offsets = array('Q', [0])
+    blob_path = target + '.tmp'
+    with open(source, 'r', encoding='utf-8', errors='replace') as src, open(blob_path, 'wb') as blob:
+        position = 0
+        for line in src:
+            joke = parse_joke(line)
+            if joke is None:
+                continue
+            tags = ','.join(joke_tags(line))
+            record = '\0'.join((joke[0], joke[1], tags)).encode('utf-8')
+            blob.write(record)
+            position += len(record)
+            offsets.append(position)
+    count = len(offsets) - 1
+    base = HEADER.size + 8 * len(offsets)  # Records start after the header and the offset table
+    with open(target + '.new', 'wb') as out, open(blob_path, 'rb') as blob:
+        out.write(HEADER.pack(MAGIC, VERSION, st.st_mtime_ns, st.st_size, count))
+        offsets = array('Q', (base + o for o in offsets))
+        offsets.tofile(out)
+        while True:
+            chunk = blob.read(1 << 20)
+            if not chunk:
+                break
+            out.write(chunk)
+    os.remove(blob_path)
+    os.replace(target + '.new', target)  # Readers never see a half-written cache
+    return count
+
+
+class CompiledJokes:
+    """A memory-mapped compiled cache, indexable like a list of (setup, punchline)."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.mtime_ns, self.size, self.count = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.map.close()
+            raise ValueError(f"{path} is not a compiled joke cache")
+        self.offsets = memoryview(self.map)[HEADER.size:HEADER.size + 8 * (self.count + 1)].cast('Q')
+
+    # True if the cache was built from the current version of `source`
+    def matches(self, source):
+        st = os.stat(source)
+        return st.st_mtime_ns == self.mtime_ns and st.st_size == self.size
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        setup, punchline, _ = self.record(i)
+        return setup.decode('utf-8'), punchline.decode('utf-8')
+
+    def tags(self, i):
+        tags = self.record(i)[2]
+        return tags.decode('utf-8').split(',') if tags else []
+
+    def record(self, i):
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        return self.map[self.offsets[i]:self.offsets[i + 1]].split(b'\0', 2)
+
+    def close(self):
+        self.offsets.release()
+        self.map.close()
+
+
+# Open the compiled cache for a joke file, (re)building it first if it is missing or stale
+def open_compiled(source):
+    target = compiled_path(source)
+    try:
+        jokes = CompiledJokes(target)
+        if jokes.matches(source):
+            return jokes
+        jokes.close()
+    except (OSError, ValueError, struct.error):
+        pass
+    compile_jokes(source, target)
+    return CompiledJokes(target)
@@ -0,0 +1,77 @@
+import http.client
+import json
+import queue
+import threading
+import time
+import uuid
+from urllib.parse import urlencode, urlsplit
+
+# Client for joke_service.py. One keep-alive connection, used only by a
+# background thread that keeps the next few jokes buffered, so showing a
+# joke never waits on the network. next_joke() returns None when nothing is
+# buffered (service down, or still starting) and the caller falls back to
+# its local file.
+
+PREFETCH = 5
+TIMEOUT = 2.0
+RETRY_SECONDS = 5.0  # Wait this long after a failed request before trying again
+
+
+class JokeClient:
+    def __init__(self, url, prefetch=PREFETCH, timeout=TIMEOUT):
+        url = urlsplit(url if '//' in url else 'http://' + url)
+        self.host = url.hostname or '127.0.0.1'
+        self.port = url.port or 80
+        self.timeout = timeout
+        self.prefetch = prefetch
+        self.client_id = uuid.uuid4().hex  # The service keeps a no-repeat queue per id
+        self.connection = None
+        self.buffer = queue.Queue()
+        self.wanted = threading.Event()
+        self.available = False  # Whether the last request worked
+        self.wanted.set()
+        threading.Thread(target=self.prefetch_loop, daemon=True).start()
+
+    # GET `path` and return the decoded JSON, reconnecting once if the kept-alive connection went stale
+    def get(self, path):
+        for attempt in range(2):
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self.connection.request('GET', path)
+                reply = self.connection.getresponse()
+                body = reply.read()
+            except (OSError, http.client.HTTPException):
+                self.connection.close()
+                self.connection = None
+                if attempt:
+                    raise
+                continue
+            if reply.status != 200:
+                raise http.client.HTTPException(f"{reply.status} for {path}")
+            return json.loads(body)
+
+    def prefetch_loop(self):
+        while True:
+            self.wanted.wait()
+            self.wanted.clear()
+            missing = self.prefetch - self.buffer.qsize()
+            if missing <= 0:
+                continue
+            try:
+                reply = self.get('/next?' + urlencode({'client': self.client_id, 'count': missing}))
+            except (OSError, http.client.HTTPException, ValueError):
+                self.available = False
+                time.sleep(RETRY_SECONDS)
+                continue
+            self.available = True
+            for joke in reply['jokes']:
+                self.buffer.put((joke['setup'], joke['punchline']))
+
+    # (setup, punchline) from the buffer, or None if there isn't one ready
+    def next_joke(self):
+        self.wanted.set()  # Top the buffer back up
+        try:
+            return self.buffer.get_nowait()
+        except queue.Empty:
+            return None
@@ -0,0 +1,225 @@
+import argparse
+import hashlib
+import heapq
+import os
+import re
+import shutil
+import string
+import sys
+import tempfile
+import time
+import unicodedata
+from collections import Counter
+
+from joke_cache import compile_jokes
+from joke_store import DELIMITER, find_corpus_files, joke_tags, parse_joke
+
+# Streaming ingestion: read any number of joke files, clean up and check
+# each joke, drop duplicates and merge everything into one corpus file in
+# the explicit "setup|punchline<TAB>tags" format, then compile its cache.
+#
+# Nothing is held in memory but the duplicate check for one partition:
+#   1. every accepted joke is written to one of N partition files, chosen
+#      by its content hash, with its input position in front
+#   2. each partition is de-duplicated on its own (first occurrence wins)
+#   3. the partitions, each still in input order, are merged back by input
+#      position, so the corpus keeps the order jokes were read in
+# N grows with the input size (PARTITION_BYTES of input per partition).
+#
+# Usage: python joke_ingest.py SOURCE ... [-o corpus] [--format auto|delimited|question]
+#                              [--delimiter '|'] [--rejects file] [--replace]
+
+PARTITION_BYTES = 32 << 20
+MAX_LENGTH = 300  # Longest setup or punchline accepted
+SEQ_WIDTH = 12  # Digits of input position in front of each partition line
+KEY_WIDTH = 16  # Hex digits of the content hash after it
+FORMATS = ('auto', 'delimited', 'question')
+
+QUOTES = str.maketrans({'‘': "'", '’': "'", '“': '"', '”': '"', '–': '-', '—': '-'})
+CONTROL = re.compile(r'[\x00-\x1f\x7f]')
+WORDS = re.compile(r'\w+')
+PUNCTUATION = re.compile(r'[^\w\s]')
+ASCII_PUNCTUATION = string.punctuation.encode()
+
+
+# Tidy one field: Unicode NFKC, straight quotes, no control characters, single spaces
+def normalize(text):
+    if not text.isascii():  # Most jokes are plain ASCII and can skip the slow part
+        text = unicodedata.normalize('NFKC', text).translate(QUOTES)
+    text = CONTROL.sub(' ', text)
+    if DELIMITER in text:
+        text = text.replace(DELIMITER, '/')  # The delimiter can't appear inside a field
+    return ' '.join(text.split())
+
+
+# Why a joke should be rejected, or None if it is fine
+def problem(setup, punchline):
+    if not setup or not punchline:
+        return 'empty setup or punchline'
+    if len(setup) > MAX_LENGTH or len(punchline) > MAX_LENGTH:
+        return 'too long'
+    if not WORDS.search(setup) or not WORDS.search(punchline):
+        return 'no words'
+    return None
+
+
+# Duplicate key: 64-bit hash of the joke's words, ignoring case, spacing and punctuation
+def content_key(setup, punchline):
+    text = f"{setup}\0{punchline}".casefold()
+    if text.isascii():
+        words = text.encode().translate(None, ASCII_PUNCTUATION)  # Much faster than the regex
+    else:
+        words = PUNCTUATION.sub('', text).encode('utf-8')
+    return hashlib.blake2b(b' '.join(words.split()), digest_size=8).hexdigest()
+
+
+# (setup, punchline) from a raw line in the given format, or None
+def split_line(line, fmt='auto', delimiter=DELIMITER):
+    if fmt == 'delimited':
+        text = line.split('\t', 1)[0]
+        if delimiter not in text:
+            return None
+        setup, punchline = text.split(delimiter, 1)
+        return setup, punchline
+    if fmt == 'question':
+        text = line.split('\t', 1)[0]
+        if '?' not in text:
+            return None
+        setup, punchline = text.split('?', 1)
+        return setup.strip() + '?', punchline
+    return parse_joke(line)
+
+
+class Ingester:
+    """Merge joke files into one de-duplicated corpus file."""
+
+    def __init__(self, target, fmt='auto', delimiter=DELIMITER, rejects=None, partition_bytes=PARTITION_BYTES):
+        if fmt not in FORMATS:
+            raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+        self.target = target
+        self.fmt = fmt
+        self.delimiter = delimiter
+        self.rejects_path = rejects
+        self.partition_bytes = partition_bytes
+        self.stats = {'files': 0, 'lines': 0, 'accepted': 0, 'duplicates': 0, 'written': 0,
+                      'rejected': Counter(), 'seconds': 0.0}
+
+    # Merge `sources` (files or folders) into the target; with keep_existing the target's jokes come first
+    def run(self, sources, keep_existing=True):
+        start = time.perf_counter()
+        files = find_corpus_files(sources)
+        target = os.path.abspath(self.target)
+        files = [f for f in files if os.path.abspath(f) != target]
+        inputs = [(f, self.fmt) for f in files]
+        if keep_existing and os.path.exists(self.target):
+            inputs.insert(0, (self.target, 'auto'))  # Existing jokes keep their numbers (and ratings)
+
+        total = sum(os.path.getsize(path) for path, _ in inputs)
+        count = max(1, -(-total // self.partition_bytes))
+        folder = tempfile.mkdtemp(prefix='ingest', dir=os.path.dirname(target))
+        try:
+            parts = [os.path.join(folder, f'part{n}') for n in range(count)]
+            self.partition(inputs, parts)
+            kept = [self.dedupe(part) for part in parts]
+            self.merge(kept, target + '.new')
+            os.replace(target + '.new', target)
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
+        compile_jokes(target)
+        self.stats['seconds'] = time.perf_counter() - start
+        return self.stats
+
+    # Pass 1: validate every line and spread the good ones over the partition files by hash
+    def partition(self, inputs, parts):
+        outs = [open(part, 'w', encoding='utf-8', newline='\n') for part in parts]
+        rejects = open(self.rejects_path, 'w', encoding='utf-8') if self.rejects_path else None
+        stats = self.stats
+        seq = 0
+        try:
+            for path, fmt in inputs:
+                stats['files'] += 1
+                with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        stats['lines'] += 1
+                        joke = split_line(line, fmt, self.delimiter)
+                        if joke is None:
+                            reason = 'no setup/punchline split'
+                        else:
+                            setup, punchline = normalize(joke[0]), normalize(joke[1])
+                            reason = problem(setup, punchline)
+                        if reason:
+                            stats['rejected'][reason] += 1
+                            if rejects:
+                                rejects.write(f"{reason}\t{path}\t{line.rstrip()}\n")
+                            continue
+                        key = content_key(setup, punchline)
+                        tags = ','.join(joke_tags(line))
+                        out = outs[int(key[:8], 16) % len(outs)]
+                        out.write(f"{seq:0{SEQ_WIDTH}d}{key}{setup}{DELIMITER}{punchline}"
+                                  + (f"\t{tags}\n" if tags else "\n"))
+                        seq += 1
+                        stats['accepted'] += 1
+        finally:
+            for out in outs:
+                out.close()
+            if rejects:
+                rejects.close()
+
+    # Pass 2: first occurrence of each key in one partition, still in input order
+    def dedupe(self, part):
+        seen = set()
+        kept = part + '.kept'
+        with open(part, 'r', encoding='utf-8') as f, open(kept, 'w', encoding='utf-8', newline='\n') as out:
+            for line in f:
+                key = line[SEQ_WIDTH:SEQ_WIDTH + KEY_WIDTH]
+                if key in seen:
+                    self.stats['duplicates'] += 1
+                    continue
+                seen.add(key)
+                out.write(line)
+        os.remove(part)
+        return kept
+
+    # Pass 3: merge the partitions back into input order (the zero-padded positions sort as text)
+    def merge(self, kept, output):
+        files = [open(path, 'r', encoding='utf-8') for path in kept]
+        try:
+            with open(output, 'w', encoding='utf-8', newline='\n') as out:
+                for line in heapq.merge(*files):
+                    out.write(line[SEQ_WIDTH + KEY_WIDTH:])
+                    self.stats['written'] += 1
+        finally:
+            for f in files:
+                f.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge joke files into a clean, de-duplicated corpus.")
+    parser.add_argument('sources', nargs='+', help="joke files or folders of .txt files")
+    default = os.path.join(os.path.dirname(__file__), 'resources', 'randomJokes.txt')
+    parser.add_argument('-o', '--output', default=default, help="corpus file to merge into")
+    parser.add_argument('--format', choices=FORMATS, default='auto',
+                        help="auto: '|' delimiter, '?' or first sentence; delimited: delimiter only; "
+                             "question: '?' only")
+    parser.add_argument('--delimiter', default=DELIMITER, help="setup/punchline separator for --format delimited")
+    parser.add_argument('--rejects', help="write rejected lines and the reason to this file")
+    parser.add_argument('--replace', action='store_true', help="replace the corpus instead of adding to it")
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    ingester = Ingester(args.output, args.format, args.delimiter, args.rejects)
+    stats = ingester.run(args.sources, keep_existing=not args.replace)
+    rejected = sum(stats['rejected'].values())
+    print(f"{stats['lines']} lines from {stats['files']} files in {stats['seconds']:.2f}s "
+          f"({stats['lines'] / max(stats['seconds'], 1e-9):,.0f} lines/s)")
+    print(f"  {stats['written']} jokes written to {args.output}, "
+          f"{stats['duplicates']} duplicates dropped, {rejected} rejected")
+    for reason, n in stats['rejected'].most_common():
+        print(f"    {n:>8}  {reason}")
+    return 0 if stats['written'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
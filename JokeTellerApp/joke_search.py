@@ -0,0 +1,206 @@
+import hashlib
+import json
+import os
+import random
+import re
+import struct
+from array import array
+
+from joke_store import CACHE_DIR, JokeCorpus
+
+# Full-text search and categories over a joke corpus. JokeSearchIndex reads
+# every joke once and builds an inverted index: for each word, the sorted
+# numbers of the jokes that contain it (in a compact array). A query looks
+# up each word's list and intersects them, starting with the shortest, so
+# it only touches jokes that could match - a few milliseconds even on
+# 100k+ jokes. Categories come from the corpus's metadata column when it
+# has one, plus the keyword rules below.
+#
+# Tokenizing the whole corpus takes a while, so open_search_index() saves
+# each joke file's word and category lists next to its compiled cache
+# (.index/<file>.jkix) and later runs read them back instead. Like the
+# compiled cache, a saved index is rebuilt when the joke file's mtime or
+# size changes, and also when the word rules below (STOP_WORDS,
+# CATEGORY_RULES, tokenize) change.
+
+WORD = re.compile(r"[a-z0-9']+")
+STOP_WORDS = {'a', 'an', 'and', 'are', 'did', 'do', 'does', 'for', 'he', 'his', 'i', 'in', 'is', 'it',
+              'of', 'on', 'she', 'the', 'to', 'was', 'what', 'when', 'why', 'you', 'your'}
+
+# Category -> words that put a joke in it
+CATEGORY_RULES = {
+    'animals': {'chicken', 'fish', 'kangaroo', 'cow', 'dog', 'cat', 'bird', 'parrot', 'horse', 'pig',
+                'duck', 'bear', 'pterodactyl', 'snake', 'bee', 'cows', 'dogs', 'cats'},
+    'food': {'noodle', 'pizza', 'cheese', 'fruit', 'carrot', 'eat', 'ate', 'impasta', 'nacho', 'cake',
+             'bread', 'soup', 'coffee', 'restaurant'},
+    'science': {'atoms', 'atom', 'scientists', 'gravity', 'space', 'planet', 'math',
+                'physics', 'chemistry', 'triangle', 'circle'},
+    'spooky': {'vampire', 'skeletons', 'skeleton', 'ghost', 'zombie', 'invisible', 'monster'},
+    'work': {'janitor', 'developer', 'drivers', 'uber', 'boss', 'job', 'office', 'customers'},
+}
+
+
+INDEX_MAGIC = b'JKIX'
+INDEX_VERSION = 1  # Bumped when the file layout or tokenize() changes
+# magic, version, source mtime_ns, source size, joke count, rules digest, directory length
+INDEX_HEADER = struct.Struct('<4sIqqq16sq')
+
+
+def tokenize(text):
+    return [word.strip("'") for word in WORD.findall(text.lower()) if word.strip("'") not in STOP_WORDS]
+
+
+# Category names for a joke's words, from CATEGORY_RULES
+def rule_tags(words):
+    return [tag for tag, keywords in CATEGORY_RULES.items() if keywords.intersection(words)]
+
+
+class JokeSearchIndex:
+    """Inverted index from words and categories to joke numbers."""
+
+    def __init__(self, jokes):
+        self.count = len(jokes)
+        postings = {}
+        categories = {}
+        has_tags = hasattr(jokes, 'tags')
+        for i in range(self.count):
+            setup, punchline = jokes[i]
+            words = set(tokenize(setup + ' ' + punchline))
+            for word in words:
+                postings.setdefault(word, array('I')).append(i)  # Appended in order, so each list stays sorted
+            tags = set(rule_tags(words))
+            if has_tags:
+                tags.update(jokes.tags(i))
+            for tag in tags:
+                categories.setdefault(tag, array('I')).append(i)
+        self.postings = postings
+        self.categories = categories
+
+    # An index from word and category lists already built (see load_search_index)
+    @classmethod
+    def from_lists(cls, count, postings, categories):
+        index = cls.__new__(cls)
+        index.count = count
+        index.postings = postings
+        index.categories = categories
+        return index
+
+    # One index over several files' indexes; starts[n] is the number of part n's first joke
+    @classmethod
+    def combine(cls, parts, starts):
+        postings = {}
+        categories = {}
+        for part, start in zip(parts, starts):
+            for mine, theirs in ((postings, part.postings), (categories, part.categories)):
+                for key, numbers in theirs.items():
+                    # Parts come in order, so appending keeps every list sorted
+                    mine.setdefault(key, array('I')).extend(numbers if start == 0 else
+                                                            array('I', [i + start for i in numbers]))
+        return cls.from_lists(sum(part.count for part in parts), postings, categories)
+
+    def tag_names(self):
+        return sorted(self.categories)
+
+    # Numbers of the jokes containing every word in `query` (and in category `tag` if given).
+    # A query made only of stop words ("why", "what") matches nothing rather than everything.
+    def search(self, query, tag=None, limit=None):
+        words = set(tokenize(query))
+        if not words and query.strip():
+            return []
+        lists = [self.postings.get(word, ()) for word in words]
+        if tag:
+            lists.append(self.categories.get(tag, ()))
+        if not lists:
+            return range(self.count if limit is None else min(limit, self.count))  # No filter: every joke
+        lists.sort(key=len)
+        matches = lists[0]
+        for other in lists[1:]:
+            if not matches:
+                break
+            other = set(other)
+            matches = [i for i in matches if i in other]
+        matches = list(matches)
+        return matches if limit is None else matches[:limit]
+
+    # A random matching joke number, or None if nothing matches
+    def random_match(self, query, tag=None, rng=random):
+        matches = self.search(query, tag)
+        return rng.choice(matches) if matches else None
+
+
+def index_path(source):
+    folder, name = os.path.split(os.path.abspath(source))
+    return os.path.join(folder, CACHE_DIR, name + '.jkix')
+
+
+# Changes whenever the word rules do, so indexes saved under the old rules aren't used
+def rules_digest():
+    rules = [INDEX_VERSION, WORD.pattern, sorted(STOP_WORDS),
+             sorted((tag, sorted(words)) for tag, words in CATEGORY_RULES.items())]
+    return hashlib.blake2b(json.dumps(rules).encode(), digest_size=16).digest()
+
+
+# Write an index built from `source` as it was when `st` (its os.stat) was taken
+def save_search_index(index, source, st, target=None):
+    target = target or index_path(source)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    # The directory lists each word and category with its length; the numbers follow in the same order
+    lists = list(index.postings.items()) + list(index.categories.items())
+    directory = json.dumps({'words': [[word, len(numbers)] for word, numbers in index.postings.items()],
+                            'tags': [[tag, len(numbers)] for tag, numbers in index.categories.items()]})
+    directory = directory.encode('utf-8')
+    with open(target + '.new', 'wb') as out:
+        out.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, st.st_mtime_ns, st.st_size, index.count,
+                                    rules_digest(), len(directory)))
+        out.write(directory)
+        for _, numbers in lists:
+            numbers.tofile(out)
+    os.replace(target + '.new', target)  # Readers never see a half-written index
+
+
+# The saved index for `source` if it is there and up to date, else None
+def load_search_index(source, target=None):
+    target = target or index_path(source)
+    try:
+        with open(target, 'rb') as f:
+            data = f.read()
+        magic, version, mtime_ns, size, count, digest, length = INDEX_HEADER.unpack_from(data, 0)
+        st = os.stat(source)
+        if (magic, version, digest) != (INDEX_MAGIC, INDEX_VERSION, rules_digest()) or \
+                (mtime_ns, size) != (st.st_mtime_ns, st.st_size):
+            return None
+        position = INDEX_HEADER.size + length
+        directory = json.loads(data[INDEX_HEADER.size:position].decode('utf-8'))
+        lists = []
+        for part in ('words', 'tags'):
+            found = {}
+            for key, n in directory[part]:
+                numbers = array('I')
+                numbers.frombytes(data[position:position + n * numbers.itemsize])
+                position += n * numbers.itemsize
+                found[key] = numbers
+            lists.append(found)
+    except (OSError, ValueError, KeyError, TypeError, struct.error):
+        return None  # Missing, stale or damaged: build it again
+    if position != len(data):
+        return None
+    return JokeSearchIndex.from_lists(count, lists[0], lists[1])
+
+
+# A search index for `jokes`: for a JokeCorpus, each file's saved index where one is up to date,
+# building (and saving) the rest
+def open_search_index(jokes):
+    if not isinstance(jokes, JokeCorpus):
+        return JokeSearchIndex(jokes)  # A plain list, e.g. the built-in fallback joke
+    parts = []
+    for path, file_jokes in zip(jokes.paths, jokes.indexes):
+        index = load_search_index(path)
+        if index is None or index.count != len(file_jokes):
+            st = os.stat(path)
+            index = JokeSearchIndex(file_jokes)
+            try:
+                save_search_index(index, path, st)
+            except OSError:
+                pass  # e.g. a read-only folder, just use it this time
+        parts.append(index)
+    return JokeSearchIndex.combine(parts, jokes.starts)
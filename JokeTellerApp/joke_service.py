@@ -0,0 +1,186 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+from collections import OrderedDict
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from joke_search import open_search_index
+from joke_store import JokeCorpus, JokeQueue, ensure_seed_corpus
+
+# A small HTTP/JSON service so many kiosks can share one indexed corpus
+# instead of each loading its own copy. It runs on asyncio with HTTP/1.1
+# keep-alive, so a client can send all its requests over one connection.
+#
+#   GET /health                         {"jokes": count}
+#   GET /random                         one joke
+#   GET /joke/<number>                  one joke
+#   GET /next?client=<id>&count=<n>     the next n jokes for that client, no repeats
+#   GET /search?q=&tag=&limit=&offset=  {"total": n, "jokes": [...]}
+#   GET /tags                           category names
+#
+# A joke is {"number", "setup", "punchline", "tags"}.
+#
+# Usage: python joke_service.py [--host H] [--port P] [joke file or folder ...]
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+MAX_CLIENTS = 10000  # No-repeat queues kept for /next, least recently used are dropped
+MAX_BATCH = 50
+MAX_PAGE = 1000  # Most jokes one /search returns
+IDLE_TIMEOUT = 60  # Seconds before an idle keep-alive connection is closed
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           503: 'Service Unavailable'}
+
+
+class JokeService:
+    """The request handlers, independent of the HTTP plumbing."""
+
+    def __init__(self, sources, rng=None):
+        self.jokes = JokeCorpus(sources)
+        self.index = open_search_index(self.jokes)
+        self.rng = rng or random.Random()
+        self.queues = OrderedDict()  # client id -> JokeQueue
+
+    def joke(self, i):
+        setup, punchline = self.jokes[i]
+        return {'number': i, 'setup': setup, 'punchline': punchline, 'tags': self.jokes.tags(i)}
+
+    def queue_for(self, client):
+        queue = self.queues.pop(client, None)
+        if queue is None:
+            queue = JokeQueue(len(self.jokes), rng=self.rng)
+            if len(self.queues) >= MAX_CLIENTS:
+                self.queues.popitem(last=False)
+        self.queues[client] = queue
+        return queue
+
+    # (status, JSON-able body) for a GET of `target`
+    def handle(self, target):
+        url = urlsplit(target)
+        path = url.path.rstrip('/') or '/'
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        count = len(self.jokes)
+
+        if path == '/health':
+            return 200, {'jokes': count}
+        if path == '/tags':
+            return 200, {'tags': self.index.tag_names()}
+        if path == '/search':
+            try:
+                limit = min(max(int(params.get('limit', 20)), 0), MAX_PAGE)
+                offset = max(int(params.get('offset', 0)), 0)
+            except ValueError:
+                return 400, {'error': 'limit and offset must be whole numbers'}
+            matches = self.index.search(params.get('q', ''), params.get('tag') or None)
+            return 200, {'total': len(matches), 'jokes': [self.joke(i) for i in matches[offset:offset + limit]]}
+
+        if not count:
+            return 503, {'error': 'no jokes loaded'}
+        if path == '/random':
+            return 200, self.joke(self.rng.randrange(count))
+        if path == '/next':
+            client = params.get('client')
+            if not client:
+                return 400, {'error': 'client is required'}
+            try:
+                batch = min(max(int(params.get('count', 1)), 1), MAX_BATCH)
+            except ValueError:
+                return 400, {'error': 'count must be a whole number'}
+            queue = self.queue_for(client)
+            return 200, {'jokes': [self.joke(queue.next()) for _ in range(batch)]}
+        if path.startswith('/joke/'):
+            number = unquote(path[len('/joke/'):])
+            # isdigit() alone lets through characters like '²' that int() refuses
+            if not (number.isascii() and number.isdigit()) or int(number) >= count:
+                return 404, {'error': f'no joke {number}'}
+            return 200, self.joke(int(number))
+        return 404, {'error': f'unknown path {path}'}
+
+    def close(self):
+        self.jokes.close()
+
+
+def response(status, body, keep_alive):
+    data = json.dumps(body).encode('utf-8')
+    head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode('ascii') + data
+
+
+# One connection: answer requests until the client closes, asks to close or goes idle
+async def serve_connection(service, reader, writer):
+    try:
+        while True:
+            try:
+                head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), IDLE_TIMEOUT)
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError):
+                break
+            lines = head.decode('latin-1').split('\r\n')
+            parts = lines[0].split()
+            if len(parts) != 3:
+                writer.write(response(400, {'error': 'bad request line'}, False))
+                break
+            method, target, version = parts
+            headers = {}
+            for line in lines[1:]:
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip().lower()
+            length = headers.get('content-length', '0')
+            if length.isascii() and length.isdigit() and int(length):
+                await reader.readexactly(int(length))  # No endpoint takes a body, skip it
+            connection = headers.get('connection', '')
+            keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+
+            if method == 'GET':
+                status, body = service.handle(target)
+            else:
+                status, body = 405, {'error': 'only GET is supported'}
+            writer.write(response(status, body, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def start_server(service, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    return await asyncio.start_server(lambda r, w: serve_connection(service, r, w), host, port)
+
+
+async def serve(service, host, port):
+    server = await start_server(service, host, port)
+    address = server.sockets[0].getsockname()
+    print(f"Serving {len(service.jokes)} jokes on http://{address[0]}:{address[1]}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve jokes over HTTP/JSON.")
+    parser.add_argument('sources', nargs='*', help="joke files or folders (default: resources/randomJokes.txt)")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    sources = args.sources
+    if not sources:
+        default = os.path.join(os.path.dirname(__file__), 'resources', 'randomJokes.txt')
+        ensure_seed_corpus(default)
+        sources = [default]
+    service = JokeService(sources)
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
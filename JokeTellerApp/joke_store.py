@@ -0,0 +1,224 @@
+import os
+import random
+import re
+from array import array
+from bisect import bisect_right
+from collections import deque
+
+# Random access to joke files without loading them. JokeIndex scans a file
+# once and keeps only the byte offset of each joke line in a compact array,
+# so a joke is read with one seek + readline when it is needed. It is the
+# fallback for when the compiled cache (joke_cache.py) can't be used.
+# JokeCorpus joins several files (or folders of .txt files)
+# into one numbered collection, and JokeQueue hands out random joke numbers
+# while avoiding anything shown recently.
+
+DEFAULT_HISTORY = 500  # How many recent jokes JokeQueue avoids repeating
+CACHE_DIR = '.index'  # Folder (next to each joke file) holding the compiled cache and search index
+DELIMITER = '|'  # Explicit setup|punchline separator
+SENTENCE_END = re.compile(r'[.!](?=\s*[A-Z"\'])')  # End of a statement setup, before the punchline starts
+
+# Written to the default joke file only if it doesn't exist yet
+SEED_JOKES = """Why did the chicken cross the road?To get to the other side.
+What happens if you boil a clown?You get a laughing stock.
+What do you call a fake noodle?An impasta.
+I told my wife she was drawing her eyebrows too high.She looked surprised.
+What do you call a fish with no eyes?Fsh.
+Why don't scientists trust atoms?Because they make up everything.
+What's orange and sounds like a parrot?A carrot.
+What do you call a lazy kangaroo?Pouch potato.
+How do you organize a space party?You planet.
+Did you hear about the invisible man who lost his wife?He couldn't see her marrying anyone else.
+What's a vampire's favorite fruit?A neck-tarine.
+I'm reading a book about anti-gravity.It's impossible to put down!
+Why don't skeletons fight each other?They don't have the guts.
+What do you call a snowman with a six-pack?An abdominal snowman.
+Why was the math book sad?Because it had too many problems.
+What do you call cheese that isn't yours?Nacho cheese.
+Why can't you hear a Pterodactyl go to the bathroom?Because the 'P' is silent.
+Why did the bicycle fall over?Because it was two tired.
+What did the triangle say to the circle?You're pointless.
+What did the husband pen say to the wife pen?You're always write.
+Who makes money by driving their customers away?Uber drivers.
+"""
+
+
+# Create the joke file with the seed jokes, leaving an existing file untouched
+def ensure_seed_corpus(path):
+    if os.path.exists(path):
+        return False
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(SEED_JOKES)
+    return True
+
+
+# Expand a list of files and folders into the joke files they contain (sorted, .txt only in folders)
+def find_corpus_files(sources):
+    files = []
+    for source in sources:
+        if os.path.isdir(source):
+            for name in sorted(os.listdir(source)):
+                path = os.path.join(source, name)
+                if name.endswith('.txt') and os.path.isfile(path):
+                    files.append(path)
+        elif os.path.isfile(source):
+            files.append(source)
+    return files
+
+
+# Split a joke line into (setup, punchline), or None if it isn't a joke:
+#   Setup|Punchline         explicit delimiter (what joke_ingest writes)
+#   Question?Answer         split after the first '?'
+#   Statement.Punchline     split after the first sentence, for setups that aren't questions
+# Anything after a tab is an optional metadata column (see joke_tags) and isn't part of the joke.
+def parse_joke(line):
+    line = line.split('\t', 1)[0].strip()
+    if DELIMITER in line:
+        setup, punchline = line.split(DELIMITER, 1)
+    elif '?' in line:
+        setup, punchline = line.split('?', 1)
+        setup = setup.strip() + '?'
+    else:
+        end = SENTENCE_END.search(line)
+        if end is None:
+            return None
+        setup, punchline = line[:end.end()], line[end.end():]
+    setup, punchline = setup.strip(), punchline.strip()
+    if not setup or not punchline:
+        return None
+    return setup, punchline
+
+
+# Tags from the optional metadata column, e.g. "Why...?Because...<TAB>animals,food"
+def joke_tags(line):
+    if '\t' not in line:
+        return []
+    meta = line.split('\t', 1)[1]
+    return [tag.strip().lower() for tag in meta.split(',') if tag.strip()]
+
+
+class JokeIndex:
+    """Byte-offset index over a joke file, indexable like a list of (setup, punchline)."""
+
+    def __init__(self, path):
+        self.path = path
+        self.offsets = self.build_offsets(path)
+        self.file = open(path, 'rb')
+
+    @staticmethod
+    def build_offsets(path):
+        offsets = array('Q')  # 8 bytes per joke
+        position = 0
+        with open(path, 'rb') as f:
+            for line in f:
+                if parse_joke(line.decode('utf-8', errors='replace')):
+                    offsets.append(position)
+                position += len(line)
+        if position < 2 ** 32:
+            offsets = array('I', offsets)  # Half the size when the file is under 4 GB
+        return offsets
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, i):
+        return parse_joke(self.read_line(i))
+
+    def tags(self, i):
+        return joke_tags(self.read_line(i))
+
+    def read_line(self, i):
+        self.file.seek(self.offsets[i])
+        return self.file.readline().decode('utf-8', errors='replace')
+
+    def close(self):
+        self.file.close()
+
+
+# Open one joke file: the compiled, memory-mapped cache if possible, else a plain offset index
+def open_joke_file(path, use_cache=True):
+    if use_cache:
+        from joke_cache import open_compiled  # joke_cache imports this module, so import it here
+        try:
+            return open_compiled(path)
+        except OSError:
+            pass  # e.g. a read-only folder, fall back to indexing the text
+    return JokeIndex(path)
+
+
+class JokeCorpus:
+    """Several joke files numbered as one collection."""
+
+    def __init__(self, sources, use_cache=True):
+        self.paths = find_corpus_files(sources)
+        self.indexes = [open_joke_file(path, use_cache) for path in self.paths]
+        self.starts = []  # Number of the first joke in each file
+        total = 0
+        for index in self.indexes:
+            self.starts.append(total)
+            total += len(index)
+        self.total = total
+
+    def __len__(self):
+        return self.total
+
+    def __getitem__(self, i):
+        index, j = self.locate(i)
+        return index[j]
+
+    def tags(self, i):
+        index, j = self.locate(i)
+        return index.tags(j)
+
+    # The file holding joke number i, and the joke's number within that file
+    def locate(self, i):
+        if not 0 <= i < self.total:
+            raise IndexError(i)
+        n = bisect_right(self.starts, i) - 1  # Empty files share a start with the next file, so are never picked
+        return self.indexes[n], i - self.starts[n]
+
+    def close(self):
+        for index in self.indexes:
+            index.close()
+
+
+class JokeQueue:
+    """Random joke numbers with no repeats within the last `history` picks.
+
+    Numbers are drawn uniformly, or from `sampler.sample(rng)` when a sampler
+    is given (e.g. ratings.WeightedSampler).
+    """
+
+    def __init__(self, count, history=None, rng=None, sampler=None):
+        self.count = count
+        self.rng = rng or random.Random()
+        self.sampler = sampler
+        if history is None:
+            history = min(DEFAULT_HISTORY, count // 2)
+        self.history = max(0, min(history, count - 1))  # Must leave at least one joke to pick
+        self.recent = deque()
+        self.recent_set = set()
+        self.upcoming = None  # Drawn early by peek()
+
+    def draw(self):
+        while True:
+            i = self.sampler.sample(self.rng) if self.sampler else self.rng.randrange(self.count)
+            if i not in self.recent_set:
+                return i
+
+    # The number the next call to next() will return, so that joke can be prepared in advance
+    def peek(self):
+        if self.upcoming is None:
+            self.upcoming = self.draw()
+        return self.upcoming
+
+    def next(self):
+        i = self.peek()
+        self.upcoming = None
+        if self.history:
+            self.recent.append(i)
+            self.recent_set.add(i)
+            if len(self.recent) > self.history:
+                self.recent_set.discard(self.recent.popleft())
+        return i
@@ -1,13 +1,20 @@
 import tkinter as tk
-import random
+import argparse
 import os
-import winsound  # For playing click.wav
+import threading
+from audio import open_audio, load_sample  # For playing click.wav on any platform
+from joke_store import JokeCorpus, JokeQueue, ensure_seed_corpus, find_corpus_files
+from joke_search import open_search_index, tokenize
+from animation import Timeline, font_pulse, pulse_fonts, typewriter
+from ratings import RatingStore, WeightedSampler, joke_key
+from joke_client import JokeClient
+from speech import Speaker, SpeechCache, open_speech
 
 class JokeTellerApp:
-    def __init__(self, master):
+    def __init__(self, master, sources=None, service=None):
         self.master = master
         master.title("Alexa Tell Me a Joke")
-        master.geometry("600x400")
+        master.geometry("820x480")
         master.config(bg='#E0F7FA')
 
         # Set window icon
@@ -22,20 +29,42 @@ class JokeTellerApp:
         script_dir = os.path.dirname(__file__)
         self.file_path = os.path.join(script_dir, 'resources', 'randomJokes.txt')
 
+        # Joke files and/or folders of .txt files to use; the default file gets seed jokes if it's missing
+        if sources:
+            self.sources = sources
+        else:
+            ensure_seed_corpus(self.file_path)
+            self.sources = [self.file_path]
+
+        # Click sound, read into memory once
+        self.audio = open_audio()
+        load_sample(self.audio, 'click', os.path.join(script_dir, 'click.wav'))
+        # Spoken setups and punchlines, synthesized in the background and cached on disk
+        self.speaker = Speaker(self.audio, open_speech(), SpeechCache(os.path.join(script_dir, 'resources', 'speech')))
+
         self.jokes = self.load_jokes()
+        # Thumbs up/down votes, which make well-liked jokes come up more often
+        self.ratings = RatingStore(os.path.join(script_dir, 'resources', 'ratings.bin'))
+        self.sampler = WeightedSampler(len(self.jokes), self.ratings, self.background_jokes)
+        self.joke_queue = JokeQueue(len(self.jokes), sampler=self.sampler) if self.jokes else None  # No-repeat
         self.current_joke = None
-        self.punchline_chars = ""
-        self.punchline_index = 0
-        self.animation_id = None
-        self.setup_pulse_id = None
-        self.punchline_pulse_id = None
+        self.current_number = None
+        # Shared joke service (joke_service.py), if one is configured; the local file is the fallback
+        service = service or os.environ.get('JOKE_SERVICE')
+        self.client = JokeClient(service) if service else None
+        self.timeline = Timeline(master)  # Drives the pulses and the typewriter from one timer
+        self.search_index = None  # Built in the background, see build_search_index
 
         # GUI Elements Setup 
 
-        # Setup Label
+        # Fonts for every pulse size, created once
         self.base_font_size = 16
+        self.setup_fonts = pulse_fonts('Roboto', self.base_font_size, 5, slant='italic')
+        self.punchline_fonts = pulse_fonts('Roboto', 18, 3, weight='bold')
+
+        # Setup Label
         self.setup_label = tk.Label(master, text="Press 'Alexa tell me a Joke' to begin!",
-                                    wraplength=550, font=('Roboto', self.base_font_size, 'italic'),
+                                    wraplength=550, font=self.setup_fonts[0],
                                     bg='#E0F7FA', fg='#333333', pady=20)
         self.setup_label.pack()
 
@@ -44,7 +73,7 @@ class JokeTellerApp:
             master,
             text="",
             wraplength=550,
-            font=('Roboto', 18, 'bold'),
+            font=self.punchline_fonts[0],
             fg='#00796B',
             bg='#B2DFDB',
             bd=2,
@@ -53,6 +82,32 @@ class JokeTellerApp:
         )
         self.punchline_label.pack(pady=10)
 
+        # Search row: words to look for, a category filter and the number of matches
+        self.search_frame = tk.Frame(master, bg='#E0F7FA')
+        self.search_frame.pack(pady=(10, 0))
+        tk.Label(self.search_frame, text="Search:", font=('Roboto', 11), bg='#E0F7FA',
+                 fg='#333333').pack(side=tk.LEFT)
+        self.search_var = tk.StringVar()
+        self.search_entry = tk.Entry(self.search_frame, textvariable=self.search_var, width=24,
+                                     font=('Roboto', 11), relief=tk.SOLID, bd=1)
+        self.search_entry.pack(side=tk.LEFT, padx=6)
+        self.tag_var = tk.StringVar(value="All")
+        self.tag_menu = tk.OptionMenu(self.search_frame, self.tag_var, "All")
+        self.tag_menu.config(font=('Roboto', 10), bg='#B2DFDB', relief=tk.FLAT, highlightthickness=0)
+        self.tag_menu.pack(side=tk.LEFT, padx=6)
+        self.match_label = tk.Label(self.search_frame, text="Indexing jokes...", font=('Roboto', 10, 'italic'),
+                                    bg='#E0F7FA', fg='#666666', width=16, anchor='w')
+        self.match_label.pack(side=tk.LEFT, padx=6)
+        self.speak_var = tk.BooleanVar(value=self.speaker.enabled)
+        self.speak_check = tk.Checkbutton(self.search_frame, text="Read aloud", variable=self.speak_var,
+                                          command=self.toggle_speech, font=('Roboto', 10), bg='#E0F7FA',
+                                          activebackground='#E0F7FA', highlightthickness=0)
+        if not self.speaker.available:
+            self.speak_check.config(state=tk.DISABLED)  # No text-to-speech engine or no sound output
+        self.speak_check.pack(side=tk.LEFT, padx=6)
+        self.search_var.trace_add('write', lambda *args: self.update_match_count())
+        self.tag_var.trace_add('write', lambda *args: self.update_match_count())
+
         # Button Frame
         self.button_frame = tk.Frame(master, bg='#E0F7FA')
         self.button_frame.pack(pady=30)
@@ -74,6 +129,19 @@ class JokeTellerApp:
         self.buttons[self.joke_button] = {'bg': '#00BCD4', 'activebg': '#00ACC1', 'padx': 15, 'pady': 8}
         self.bind_hover_events(self.joke_button)
 
+        # Random joke matching the search box / category
+        self.match_button = tk.Button(
+            self.button_frame,
+            text="Joke matching search",
+            command=lambda: [self.play_click_sound(), self.tell_matching_joke()],
+            state=tk.DISABLED,
+            bg='#009688', fg='white', font=button_font,
+            relief=tk.FLAT, padx=button_padx, pady=button_pady, borderwidth=0
+        )
+        self.match_button.pack(side=tk.LEFT, padx=10)
+        self.buttons[self.match_button] = {'bg': '#009688', 'activebg': '#00897B', 'padx': 15, 'pady': 8}
+        self.bind_hover_events(self.match_button)
+
         # 4. Show Punchline Button
         self.punchline_button = tk.Button(
             self.button_frame,
@@ -87,6 +155,22 @@ class JokeTellerApp:
         self.buttons[self.punchline_button] = {'bg': '#8BC34A', 'activebg': '#7CB342', 'padx': 15, 'pady': 8}
         self.bind_hover_events(self.punchline_button)
 
+        # Rating Buttons
+        self.rate_buttons = []
+        for text, vote, color, active in (("👍", 1, '#4CAF50', '#43A047'), ("👎", -1, '#E57373', '#EF5350')):
+            button = tk.Button(
+                self.button_frame,
+                text=text,
+                command=lambda vote=vote: [self.play_click_sound(), self.rate_joke(vote)],
+                state=tk.DISABLED,
+                bg=color, fg='white', font=button_font,
+                relief=tk.FLAT, padx=8, pady=button_pady, borderwidth=0
+            )
+            button.pack(side=tk.LEFT, padx=2)
+            self.buttons[button] = {'bg': color, 'activebg': active, 'padx': 8, 'pady': 8}
+            self.bind_hover_events(button)
+            self.rate_buttons.append(button)
+
         # Next Joke Button
         self.next_button = tk.Button(
             self.button_frame,
@@ -112,11 +196,15 @@ class JokeTellerApp:
         self.buttons[self.quit_button] = {'bg': '#F44336', 'activebg': '#D32F2F', 'padx': 15, 'pady': 8}
         self.bind_hover_events(self.quit_button)
 
+        self.build_search_index()
+
     # Click Sound
     def play_click_sound(self):
-        sound_path = os.path.join(os.path.dirname(__file__), 'click.wav')
-        if os.path.exists(sound_path):
-            winsound.PlaySound(sound_path, winsound.SND_FILENAME | winsound.SND_ASYNC)
+        self.audio.play('click')
+
+    def toggle_speech(self):
+        self.speaker.enabled = self.speak_var.get()
+        self.speaker.stop()
 
     # Hover Animations
     def bind_hover_events(self, widget):
@@ -130,145 +218,131 @@ class JokeTellerApp:
         else:
             widget.config(bg=config['bg'], padx=config['padx'], pady=config['pady'])
 
-    # Pulse Animations
-    def pulse_setup_label(self, step=0):
-        if self.setup_pulse_id is None:
-            return
-        max_step = 5
-        duration = 50
-        if step < max_step:
-            new_size = self.base_font_size + step
-            self.setup_label.config(font=('Roboto', new_size, 'italic'))
-            step += 1
-            self.setup_pulse_id = self.master.after(duration, lambda: self.pulse_setup_label(step))
-        elif step < max_step * 2:
-            new_size = self.base_font_size + (max_step * 2) - step
-            self.setup_label.config(font=('Roboto', new_size, 'italic'))
-            step += 1
-            self.setup_pulse_id = self.master.after(duration, lambda: self.pulse_setup_label(step))
-        else:
-            self.setup_label.config(font=('Roboto', self.base_font_size, 'italic'))
-            self.setup_pulse_id = None
-
-    def pulse_punchline_label(self, step=0):
-        if self.punchline_pulse_id is None:
-            return
-        max_step = 3
-        duration = 50
-        if step < max_step:
-            self.punchline_label.config(font=('Roboto', 18 + step, 'bold'))
-            step += 1
-            self.punchline_pulse_id = self.master.after(duration, lambda: self.pulse_punchline_label(step))
-        elif step < max_step * 2:
-            self.punchline_label.config(font=('Roboto', 18 + (max_step * 2) - step, 'bold'))
-            step += 1
-            self.punchline_pulse_id = self.master.after(duration, lambda: self.pulse_punchline_label(step))
-        else:
-            self.punchline_label.config(font=('Roboto', 18, 'bold'))
-            self.punchline_pulse_id = None
-
     # Joke Logic
     def load_jokes(self):
-        jokes = []
+        # Index the joke files instead of reading them all: jokes are read one at a time when shown
         try:
-            with open(self.file_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if '?' in line:
-                        setup, punchline = line.split('?', 1)
-                        jokes.append((setup.strip() + '?', punchline.strip()))
+            if not find_corpus_files(self.sources):
+                return [("Could not load jokes!", "Please ensure 'randomJokes.txt' is in the 'resources' folder.")]
+            jokes = JokeCorpus(self.sources)
             if not jokes:
-                jokes.append(("Why did the developer go broke?", "Because he used up all his cache!"))
+                jokes = [("Why did the developer go broke?", "Because he used up all his cache!")]
             return jokes
-        except FileNotFoundError:
-            self.setup_label.config(text=f"Error: Joke file not found at {self.file_path}", fg='red')
-            return [("Could not load jokes!", "Please ensure 'randomJokes.txt' is in the 'resources' folder.")]
         except Exception as e:
-            self.setup_label.config(text=f"An error occurred while loading jokes: {e}", fg='red')
             return [("Loading Error!", f"Details: {e}")]
 
-    def tell_joke(self):
-        if self.animation_id:
-            self.master.after_cancel(self.animation_id)
-            self.animation_id = None
-        if self.setup_pulse_id:
-            self.master.after_cancel(self.setup_pulse_id)
-            self.setup_pulse_id = None
-        if self.punchline_pulse_id:
-            self.master.after_cancel(self.punchline_pulse_id)
-            self.punchline_pulse_id = None
+    # Search
+    # The jokes again, with file handles of their own for use from another thread
+    def background_jokes(self):
+        return JokeCorpus(self.sources) if isinstance(self.jokes, JokeCorpus) else self.jokes
+
+    def build_search_index(self):
+        # Indexing a big corpus takes a moment, so do it in a thread with its own file handles
+        def build():
+            self.search_index = open_search_index(self.background_jokes())
+        threading.Thread(target=build, daemon=True).start()
+        self.master.after(100, self.check_search_ready)
+
+    def check_search_ready(self):
+        if self.search_index is None:
+            self.master.after(100, self.check_search_ready)
+            return
+        menu = self.tag_menu['menu']
+        for tag in self.search_index.tag_names():
+            menu.add_command(label=tag, command=lambda tag=tag: self.tag_var.set(tag))
+        self.match_button.config(state=tk.NORMAL)
+        self.update_match_count()
+
+    def current_filter(self):
+        tag = self.tag_var.get()
+        return self.search_var.get(), (None if tag == "All" else tag)
+
+    def update_match_count(self):
+        if self.search_index is None:
+            return
+        query, tag = self.current_filter()
+        if query.strip() and not tokenize(query):
+            self.match_label.config(text="Words too common")  # Only stop words, nothing to search for
+            return
+        count = len(self.search_index.search(query, tag))
+        self.match_label.config(text=f"{count} match" + ("" if count == 1 else "es"))
+
+    def tell_matching_joke(self):
+        if self.search_index is None:
+            return
+        query, tag = self.current_filter()
+        number = self.search_index.random_match(query, tag)
+        if number is None:
+            self.setup_label.config(text=f"No jokes match '{query}'" + (f" in {tag}" if tag else ""))
+            self.punchline_label.config(text="")
+            self.punchline_button.config(state=tk.DISABLED)
+            return
+        self.tell_joke(number)
+
+    def tell_joke(self, number=None):
+        self.timeline.stop_all()
+        self.punchline_label.config(font=self.punchline_fonts[0])
 
         if not self.jokes:
             return
 
-        self.current_joke = random.choice(self.jokes)
-        setup, _ = self.current_joke
+        remote = self.client.next_joke() if number is None and self.client else None
+        if remote:
+            self.current_number = None  # Numbered in the service's corpus, so it can't be rated here
+            self.current_joke = remote
+        else:
+            if number is None:
+                number = self.joke_queue.next()
+            self.current_number = number
+            self.current_joke = self.jokes[number]
+        setup, punchline = self.current_joke
+
+        # Speak the setup, and get the punchline and the next joke ready so they play without a wait
+        self.speaker.say(setup)
+        self.speaker.prepare(punchline)
+        if not remote and self.joke_queue:
+            for text in self.jokes[self.joke_queue.peek()]:
+                self.speaker.prepare(text)
 
         self.setup_label.config(text=setup)
         self.punchline_label.config(text="")
 
         self.punchline_button.config(state=tk.NORMAL)
         self.next_button.config(state=tk.NORMAL)
+        for button in self.rate_buttons:
+            button.config(state=tk.NORMAL if self.current_number is not None else tk.DISABLED)
 
         self.joke_button.pack_forget()
         self.next_button.pack(side=tk.LEFT, padx=10)
 
-        self.setup_pulse_id = 1
-        self.pulse_setup_label()
+        self.timeline.play('setup_pulse', font_pulse(self.setup_label, self.setup_fonts))
 
-    def animate_punchline(self):
-        if self.punchline_index < len(self.punchline_chars):
-            current_text = self.punchline_label.cget("text")
-            self.punchline_label.config(text=current_text + self.punchline_chars[self.punchline_index])
-            self.punchline_index += 1
-            self.animation_id = self.master.after(50, self.animate_punchline)
-        else:
-            self.animation_id = None
+    # One vote per showing of a joke
+    def rate_joke(self, vote):
+        if self.current_number is None or not isinstance(self.jokes, JokeCorpus):
+            return  # Nothing to rate (or only the built-in fallback joke)
+        self.ratings.rate(joke_key(*self.current_joke), self.current_number, vote)
+        self.sampler.ratings_changed()
+        for button in self.rate_buttons:
+            button.config(state=tk.DISABLED)
 
     def show_punchline(self):
         if self.current_joke:
             _, punchline = self.current_joke
-            self.punchline_chars = punchline
-            self.punchline_index = 0
             self.punchline_label.config(text="")
-            self.animate_punchline()
+            self.speaker.say(punchline)
+            self.timeline.play('punchline_text', typewriter(self.punchline_label, punchline))
 
             self.punchline_button.config(state=tk.DISABLED)
 
-            self.punchline_pulse_id = 1
-            self.pulse_punchline_label()
+            self.timeline.play('punchline_pulse', font_pulse(self.punchline_label, self.punchline_fonts))
 
-# Main execution
+# Main execution: python main.py [--service host:port] [joke file or folder ...]
 if __name__ == "__main__":
-    resource_dir = os.path.join(os.path.dirname(__file__), 'resources')
-    os.makedirs(resource_dir, exist_ok=True)
-
-    dummy_file_path = os.path.join(resource_dir, 'randomJokes.txt')
-    new_joke_content = """Why did the chicken cross the road?To get to the other side.
-What happens if you boil a clown?You get a laughing stock.
-What do you call a fake noodle?An impasta.
-I told my wife she was drawing her eyebrows too high.She looked surprised.
-What do you call a fish with no eyes?Fsh.
-Why don't scientists trust atoms?Because they make up everything.
-What's orange and sounds like a parrot?A carrot.
-What do you call a lazy kangaroo?Pouch potato.
-How do you organize a space party?You planet.
-Did you hear about the invisible man who lost his wife?He couldn't see her marrying anyone else.
-What's a vampire's favorite fruit?A neck-tarine.
-I'm reading a book about anti-gravity.It's impossible to put down!
-Why don't skeletons fight each other?They don't have the guts.
-What do you call a snowman with a six-pack?An abdominal snowman.
-Why was the math book sad?Because it had too many problems.
-What do you call cheese that isn't yours?Nacho cheese.
-Why can't you hear a Pterodactyl go to the bathroom?Because the 'P' is silent.
-Why did the bicycle fall over?Because it was two tired.
-What did the triangle say to the circle?You're pointless.
-What did the husband pen say to the wife pen?You're always write.
-Who makes money by driving their customers away?Uber drivers.
-"""
-    with open(dummy_file_path, 'w', encoding='utf-8') as f:
-        f.write(new_joke_content)
-
+    parser = argparse.ArgumentParser(description="Alexa Tell Me a Joke")
+    parser.add_argument('sources', nargs='*', help="joke files or folders (default: resources/randomJokes.txt)")
+    parser.add_argument('--service', help="joke service to get jokes from, e.g. 127.0.0.1:8765")
+    args = parser.parse_args()
     root = tk.Tk()
-    app = JokeTellerApp(root)
+    app = JokeTellerApp(root, args.sources, args.service)
     root.mainloop()
@@ -0,0 +1,191 @@
+import os
+import random
+import struct
+import threading
+import time
+from array import array
+
+from joke_ingest import content_key
+
+# Thumbs up/down ratings and rating-weighted joke picking.
+#
+# RatingStore appends each vote to a small binary file (13 bytes per vote:
+# the joke's content key, its joke number at the time, and the vote) and
+# keeps a running score per rated joke in memory. Votes are keyed by content
+# (joke_ingest.content_key) rather than by joke number, so adding, removing
+# or re-ordering jokes in the corpus doesn't move a rating onto another joke;
+# the stored number is only a hint for finding the joke again quickly.
+#
+# WeightedSampler picks joke numbers in proportion to their weight using an
+# alias table (Vose's method), so every pick is O(1). Only rated jokes get
+# their own entry; all unrated jokes (weight 1 each) share one "unrated"
+# entry and are then picked uniformly. That keeps the table - and each
+# rebuild - as small as the number of rated jokes, and rebuilds happen on a
+# background thread after votes, swapping the new table in when ready.
+
+MAGIC = b'JRT2'  # Version 1 files were keyed by joke number alone and are started afresh
+RECORD = struct.Struct('<8sIb')  # content key, joke number when rated, vote (+1 or -1)
+MIN_WEIGHT = 1 / 8
+MAX_WEIGHT = 8.0
+
+
+# Weight for a joke's score: doubles every 2 net thumbs up, halves every 2 thumbs down
+def weight_for(score):
+    return min(MAX_WEIGHT, max(MIN_WEIGHT, 2 ** (score / 2)))
+
+
+# The key a joke's votes are stored under
+def joke_key(setup, punchline):
+    return bytes.fromhex(content_key(setup, punchline))
+
+
+class RatingStore:
+    """Append-only vote log with per-joke running scores, keyed by joke content."""
+
+    def __init__(self, path):
+        self.path = path
+        self.scores = {}   # key -> net score
+        self.numbers = {}  # key -> joke number it was last seen at
+        data = b''
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                data = f.read()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        if not data.startswith(MAGIC):
+            # Missing, empty or an old number-keyed log: those votes can't be matched to jokes any more
+            with open(path, 'wb') as f:
+                f.write(MAGIC)
+            data = MAGIC
+        body = data[len(MAGIC):]
+        usable = len(body) - len(body) % RECORD.size
+        for key, number, vote in RECORD.iter_unpack(body[:usable]):
+            self.scores[key] = self.scores.get(key, 0) + vote
+            self.numbers[key] = number
+        self.file = open(path, 'ab')
+        if usable < len(body):
+            self.file.truncate(len(MAGIC) + usable)  # Drop a half-written last record so new ones line up
+
+    def rate(self, key, number, vote):
+        vote = 1 if vote > 0 else -1
+        self.file.write(RECORD.pack(key, number, vote))
+        self.file.flush()
+        self.scores[key] = self.scores.get(key, 0) + vote
+        self.numbers[key] = number
+        return self.scores[key]
+
+    def score(self, key):
+        return self.scores.get(key, 0)
+
+    def close(self):
+        self.file.close()
+
+
+class AliasTable:
+    """Vose's alias method: O(n) to build, O(1) to sample."""
+
+    def __init__(self, weights):
+        n = len(weights)
+        self.prob = array('d', [0.0]) * n
+        self.alias = array('I', [0]) * n
+        total = sum(weights)
+        if n == 0 or total <= 0:
+            return
+        scaled = [w * n / total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s = small.pop()
+            g = large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = g
+            scaled[g] = scaled[g] + scaled[s] - 1.0
+            if scaled[g] < 1.0:
+                small.append(g)
+            else:
+                large.append(g)
+        for i in large + small:  # Whatever is left is 1.0 give or take rounding
+            self.prob[i] = 1.0
+
+    def __len__(self):
+        return len(self.prob)
+
+    def sample(self, rng=random):
+        i = rng.randrange(len(self.prob))
+        return i if rng.random() < self.prob[i] else self.alias[i]
+
+
+class WeightedSampler:
+    """Rating-weighted random joke numbers, with the alias table rebuilt in the background.
+
+    `open_jokes()` is called on the background thread for a corpus of its own
+    (file handles aren't shared with the GUI thread), used to check that each
+    rated joke is still at the number it was rated at.
+    """
+
+    def __init__(self, count, store, open_jokes):
+        self.count = count
+        self.store = store
+        self.open_jokes = open_jokes
+        self.jokes = None
+        self.searched = False  # Whether the corpus has been scanned for moved jokes yet
+        self.current = [], AliasTable([float(count)]), set()  # Uniform until the first build
+        self.dirty = threading.Event()
+        self.dirty.set()
+        threading.Thread(target=self.rebuild_loop, daemon=True).start()
+
+    # Joke number of each rated key that is still in the corpus
+    def locate(self):
+        if self.jokes is None:
+            self.jokes = self.open_jokes()
+        found = {}
+        missing = set()
+        for key in list(self.store.scores):
+            number = self.store.numbers.get(key)
+            if number is not None and number < self.count and joke_key(*self.jokes[number]) == key:
+                found[key] = number
+            else:
+                missing.add(key)
+        if missing and not self.searched:
+            # The corpus changed since these were rated; look for them once per run
+            self.searched = True
+            for number in range(self.count):
+                key = joke_key(*self.jokes[number])
+                if key in missing:
+                    found[key] = self.store.numbers[key] = number
+                    missing.discard(key)
+                    if not missing:
+                        break
+                if number % 10000 == 0:
+                    time.sleep(0)  # Let the GUI thread run
+        return found
+
+    # (rated joke numbers, alias table over them + the unrated bucket, set of rated numbers)
+    def build(self):
+        found = self.locate()
+        rated = sorted(set(found.values()))
+        scores = {}
+        for key, number in found.items():  # Two keys on one number only if the corpus repeats a joke
+            scores[number] = scores.get(number, 0) + self.store.score(key)
+        weights = [weight_for(scores[joke]) for joke in rated]
+        weights.append(float(self.count - len(rated)))  # Every unrated joke has weight 1
+        return rated, AliasTable(weights), set(rated)
+
+    def rebuild_loop(self):
+        while True:
+            self.dirty.wait()
+            self.dirty.clear()
+            self.current = self.build()  # Swapped in one assignment, picks never see half a table
+
+    # Call after a vote; the new table is built off the GUI thread
+    def ratings_changed(self):
+        self.dirty.set()
+
+    def sample(self, rng=random):
+        rated, table, rated_set = self.current
+        k = table.sample(rng)
+        if k < len(rated):
+            return rated[k]
+        while True:  # Unrated bucket: uniform over jokes nobody has rated
+            joke = rng.randrange(self.count)
+            if joke not in rated_set:
+                return joke
@@ -0,0 +1,207 @@
+import hashlib
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+from collections import OrderedDict
+
+# Offline text-to-speech for jokes. A speech backend turns text into a WAV
+# file; SpeechCache keeps those files on disk, named by a hash of the voice
+# and text, and deletes the least recently used ones past a size limit.
+# Speaker does all synthesis on one worker thread: say() speaks as soon as
+# the audio is ready, prepare() just makes sure it is cached, so the
+# punchline (and the next joke) can be synthesized while the setup is on
+# screen and then play instantly. Playback goes through the voice channel
+# of the app's audio backend (audio.py), so clicks don't wait for speech
+# and stop() cuts it off; with no audio backend there is nothing to hear,
+# so speech is left off.
+#
+# open_speech() picks espeak-ng/espeak or pyttsx3, else a silent
+# NullSpeech. Set JOKE_TTS=espeak|pyttsx3|null to force one.
+
+CACHE_BYTES = 50 << 20
+SAY, PREPARE = 0, 1  # Request priorities: speaking now goes ahead of preparing
+
+
+class NullSpeech:
+    """No speech (no TTS engine installed, or tests)."""
+    name = 'null'
+    voice = ''
+
+    def synthesize(self, text, path):
+        return False
+
+
+class EspeakSpeech:
+    """The espeak-ng (or espeak) command-line synthesizer."""
+    name = 'espeak'
+
+    def __init__(self, voice='en', rate=160):
+        self.command = shutil.which('espeak-ng') or shutil.which('espeak')
+        if not self.command:
+            raise OSError("espeak is not installed")
+        self.voice = f'{voice}-{rate}'
+        self.args = ['-v', voice, '-s', str(rate)]
+
+    def synthesize(self, text, path):
+        subprocess.run([self.command, *self.args, '-w', path, '--stdin'], input=text.encode('utf-8'),
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True, timeout=30)
+        return True
+
+
+class Pyttsx3Speech:
+    """pyttsx3 (SAPI5 on Windows, NSSpeechSynthesizer on macOS, espeak on Linux)."""
+    name = 'pyttsx3'
+
+    def __init__(self, rate=160):
+        import pyttsx3
+        self.pyttsx3 = pyttsx3
+        self.rate = rate
+        self.voice = str(rate)
+        self.engine = None  # Created on the worker thread, pyttsx3 engines stay on one thread
+
+    def synthesize(self, text, path):
+        if self.engine is None:
+            self.engine = self.pyttsx3.init()
+            self.engine.setProperty('rate', self.rate)
+        self.engine.save_to_file(text, path)
+        self.engine.runAndWait()
+        return os.path.exists(path)
+
+
+BACKENDS = {'espeak': EspeakSpeech, 'pyttsx3': Pyttsx3Speech, 'null': NullSpeech}
+
+
+# The first speech backend that can be created (or the one named in JOKE_TTS)
+def open_speech(preferred=None):
+    preferred = preferred or os.environ.get('JOKE_TTS')
+    if preferred:
+        order = [preferred]
+    elif sys.platform == 'win32':
+        order = ['pyttsx3', 'espeak']
+    else:
+        order = ['espeak', 'pyttsx3']
+    for name in order:
+        try:
+            return BACKENDS[name]()
+        except Exception:
+            continue  # Not installed, try the next one
+    return NullSpeech()
+
+
+class SpeechCache:
+    """Folder of synthesized WAV files with least-recently-used eviction."""
+
+    def __init__(self, folder, max_bytes=CACHE_BYTES):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        os.makedirs(folder, exist_ok=True)
+        entries = []
+        for name in os.listdir(folder):
+            if name.endswith('.wav'):
+                st = os.stat(os.path.join(folder, name))
+                entries.append((st.st_mtime, name, st.st_size))
+        entries.sort()  # Oldest first; a hit touches the file, so mtime is the last use
+        self.files = OrderedDict((name, size) for _, name, size in entries)
+        self.total = sum(self.files.values())
+
+    @staticmethod
+    def key(speech, text):
+        return hashlib.blake2b(f"{speech.name}\0{speech.voice}\0{text}".encode('utf-8'), digest_size=16).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.folder, key + '.wav')
+
+    # Path of the cached audio for `key`, or None
+    def get(self, key):
+        name = key + '.wav'
+        if name not in self.files:
+            return None
+        self.files.move_to_end(name)
+        path = self.path(key)
+        try:
+            os.utime(path)
+        except OSError:
+            self.total -= self.files.pop(name)  # Deleted behind our back
+            return None
+        return path
+
+    # Store a finished file (synthesized to a temporary path) under `key`
+    def put(self, key, temp_path):
+        name = key + '.wav'
+        path = self.path(key)
+        os.replace(temp_path, path)
+        self.total -= self.files.pop(name, 0)
+        self.files[name] = os.path.getsize(path)
+        self.total += self.files[name]
+        while self.total > self.max_bytes and len(self.files) > 1:
+            old, size = self.files.popitem(last=False)
+            self.total -= size
+            try:
+                os.remove(os.path.join(self.folder, old))
+            except OSError:
+                pass
+        return path
+
+
+class Speaker:
+    """Speaks text through `audio`, synthesizing and caching it on a worker thread."""
+
+    def __init__(self, audio, speech, cache):
+        self.audio = audio
+        self.speech = speech
+        self.cache = cache
+        self.available = not isinstance(speech, NullSpeech) and audio.name != 'null'
+        self.enabled = self.available
+        self.requests = queue.PriorityQueue()
+        self.order = 0  # Keeps requests of the same priority first-in, first-out
+        self.generation = 0  # Bumped by say()/stop(), so speech for a joke that's gone isn't played
+        threading.Thread(target=self.worker, daemon=True).start()
+
+    def request(self, priority, text, play):
+        self.order += 1
+        self.requests.put((priority, self.order, text, play, self.generation))
+
+    # Speak `text` as soon as it is ready, instead of anything being (or waiting to be) spoken
+    def say(self, text):
+        self.stop()
+        if self.enabled and text:
+            self.request(SAY, text, True)
+
+    # Synthesize `text` now so a later say() plays without delay
+    def prepare(self, text):
+        if self.enabled and text:
+            self.request(PREPARE, text, False)
+
+    def stop(self):
+        self.generation += 1
+        if self.available:
+            self.audio.stop_voice()
+
+    def worker(self):
+        while True:
+            _, _, text, play, generation = self.requests.get()
+            if play and generation != self.generation:
+                continue  # Superseded before we got to it
+            key = self.cache.key(self.speech, text)
+            path = self.cache.get(key)
+            if path is None:
+                path = self.synthesize(key, text)
+            if path and play and generation == self.generation:
+                try:
+                    self.audio.play_voice(path)
+                except Exception:
+                    pass  # An unplayable clip is silence, like a failed synthesis
+
+    def synthesize(self, key, text):
+        temp = self.cache.path(key) + f'.{threading.get_ident()}.tmp'
+        try:
+            if self.speech.synthesize(text, temp):
+                return self.cache.put(key, temp)
+        except Exception:
+            pass  # A failed synthesis just means silence for this line
+        if os.path.exists(temp):
+            os.remove(temp)
+        return None
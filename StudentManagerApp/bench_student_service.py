@@ -0,0 +1,174 @@
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+
+from student import Student, save_students
+from student_grading import load_student_policy
+from student_service import RosterStore, StudentService, start_server
+
+# Load test for student_service.py: `clients` threads, each with its own
+# connection, send a mix of lookups, list pages, top/bottom pages, searches
+# and (a few) updates, and the script reports requests per second and
+# latency percentiles. Every update rewrites the data file, so --writes
+# sets what fraction of requests are updates.
+#
+# By default it starts a service on a free localhost port over a generated
+# roster; pass --url to test a service that is already running (updates
+# then change its file for real, so they are off unless --writes is given).
+#
+# Usage: python bench_student_service.py [--clients N] [--requests N] [--students N]
+#                                        [--writes F] [--no-keepalive] [--url host:port]
+
+QUERIES = ['an', 'smith', 'jo', '12', '5', 'lee']
+NAMES = ['John', 'Sam', 'Lee', 'Matt', 'Ron', 'Jake', 'Jo', 'Alan', 'Les', 'Anna', 'Priya', 'Chen']
+SURNAMES = ['Curry', 'Scott', 'Smith', 'Hyde', 'Hobbs', 'Shearer', 'Ferdinand', 'Thompson', 'Patel', 'Wong']
+
+
+def make_roster(path, size, seed=0):
+    rng = random.Random(seed)
+    codes = rng.sample(range(1000, 10000), min(size, 9000))  # Codes are four digits, so at most 9000 students
+    save_students(path, [Student(code, f"{rng.choice(NAMES)} {rng.choice(SURNAMES)}", rng.randint(0, 20),
+                                 rng.randint(0, 20), rng.randint(0, 20), rng.randint(0, 100)) for code in codes])
+    return codes
+
+
+# Start a StudentService on an event loop in a background thread, returns the port it listens on
+def start_local_service(path):
+    service = StudentService(RosterStore(path, load_student_policy()))
+    started = threading.Event()
+    ports = []
+
+    def run():
+        async def go():
+            server = await start_server(service, '127.0.0.1', 0)
+            ports.append(server.sockets[0].getsockname()[1])
+            started.set()
+            await server.serve_forever()
+        asyncio.run(go())
+
+    threading.Thread(target=run, daemon=True).start()
+    started.wait()
+    return ports[0]
+
+
+def client_requests(count, codes, writes, rng):
+    for _ in range(count):
+        kind = rng.random()
+        if kind < writes:
+            yield 'PUT', f'/students/{rng.choice(codes)}', {'exam': rng.randint(0, 100)}
+        elif kind < 0.5:
+            yield 'GET', f'/students/{rng.choice(codes)}', None
+        elif kind < 0.7:
+            yield 'GET', f'/students?limit=20&offset={rng.randrange(len(codes))}', None
+        elif kind < 0.85:
+            yield 'GET', f"/{rng.choice(['top', 'bottom'])}?limit=10", None
+        else:
+            yield 'GET', f'/search?q={rng.choice(QUERIES)}&limit=20', None
+
+
+# One client's requests; latencies (ms) go into `latencies`
+def run_client(host, port, count, codes, writes, keep_alive, latencies, seed):
+    rng = random.Random(seed)
+    connection = None
+    mine = []
+    for method, path, body in client_requests(count, codes, writes, rng):
+        start = time.perf_counter()
+        if connection is None:
+            connection = http.client.HTTPConnection(host, port, timeout=10)
+        headers = {} if keep_alive else {'Connection': 'close'}
+        if body is not None:
+            headers['Content-Type'] = 'application/json'
+            body = json.dumps(body)
+        connection.request(method, path, body=body, headers=headers)
+        reply = connection.getresponse()
+        reply.read()
+        if reply.status != 200:
+            raise RuntimeError(f"{reply.status} for {method} {path}")
+        if not keep_alive:
+            connection.close()
+            connection = None
+        mine.append((time.perf_counter() - start) * 1000)
+    if connection is not None:
+        connection.close()
+    latencies.extend(mine)
+
+
+# Codes of the students a running service has, fetched a page at a time
+def remote_codes(host, port):
+    connection = http.client.HTTPConnection(host, port, timeout=10)
+    codes = []
+    while True:
+        connection.request('GET', f'/students?limit=1000&offset={len(codes)}')
+        page = json.loads(connection.getresponse().read())
+        codes += [student['code'] for student in page['students']]
+        if not page['students'] or len(codes) >= page['total']:
+            break
+    connection.close()
+    return codes
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the student service.")
+    parser.add_argument('--url', help="host:port of a running service (default: start one here)")
+    parser.add_argument('--clients', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=500, help="requests per client")
+    parser.add_argument('--students', type=int, default=9000, help="roster size for the local service")
+    parser.add_argument('--writes', type=float, help="fraction of requests that are updates "
+                                                     "(default 0.01, or 0 with --url)")
+    parser.add_argument('--no-keepalive', action='store_true', help="open a new connection per request")
+    args = parser.parse_args()
+
+    folder = None
+    try:
+        if args.url:
+            host, _, port = args.url.rpartition('//')[2].partition(':')
+            port = int(port or 80)
+            codes = remote_codes(host, port)
+            writes = args.writes or 0.0
+        else:
+            folder = tempfile.mkdtemp(prefix='studentservice')
+            path = os.path.join(folder, 'studentMarks.txt')
+            codes = make_roster(path, args.students)
+            host, port = '127.0.0.1', start_local_service(path)
+            writes = 0.01 if args.writes is None else args.writes
+        if not codes:
+            parser.exit(1, "Error: the roster is empty\n")
+
+        latencies = []
+        threads = [threading.Thread(target=run_client, args=(host, port, args.requests, codes, writes,
+                                                             not args.no_keepalive, latencies, n))
+                   for n in range(args.clients)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        latencies.sort()
+        print(f"{len(latencies)} requests from {args.clients} clients over {len(codes)} students in "
+              f"{elapsed:.2f}s ({'new connection each' if args.no_keepalive else 'keep-alive'}, "
+              f"{writes:.0%} updates)")
+        print(f"  {len(latencies) / elapsed:,.0f} requests/s")
+        print(f"  latency ms: mean {statistics.mean(latencies):.2f}  p50 {percentile(latencies, 0.5):.2f}  "
+              f"p95 {percentile(latencies, 0.95):.2f}  p99 {percentile(latencies, 0.99):.2f}  "
+              f"max {latencies[-1]:.2f}")
+    finally:
+        if folder:
+            shutil.rmtree(folder)
+
+
+if __name__ == "__main__":
+    main()
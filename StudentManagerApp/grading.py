@@ -0,0 +1,143 @@
+import json, os  # JSON policy files
+from bisect import bisect_right
+from operator import attrgetter, itemgetter, mul
+
+# Grading policies shared by the Math Quiz and the Student Manager. A policy
+# says which marks make up a result (each with its maximum and its weight)
+# and the lowest percentage for each grade. It is loaded from a JSON file:
+#
+#   {"components": [{"name": "exam", "max": 100, "weight": 100}, ...],
+#    "boundaries": [["A", 70], ["B", 60], ["C", 50], ["D", 40]],
+#    "fail": "F"}
+#
+# Percentages for a whole cohort are worked out column by column, and the
+# grades come from one bisect (or numpy.searchsorted) pass over the sorted
+# boundaries, so regrading every student after a policy change is one call.
+# numpy is only imported the first time a big column is graded, so loading
+# a policy (e.g. when the quiz starts) doesn't pay for it.
+#
+# This is the Student Manager's copy of the Math Quiz's grading.py (in the
+# folder above), so each app runs from its own folder; keep the two the same.
+
+NUMPY_ROWS = 1000  # Columns longer than this are graded with numpy, if it is installed
+numpy = False  # Not looked for yet; None once it turns out not to be installed
+
+
+def optional_numpy():
+    global numpy
+    if numpy is False:
+        try:
+            import numpy as module
+        except ImportError:
+            module = None
+        numpy = module
+    return numpy
+
+
+class PolicyError(ValueError):
+    """A grading policy file that can't be used."""
+
+
+class GradingPolicy:
+    def __init__(self, components, boundaries, fail="F"):
+        # components: [(name, max mark, weight)], boundaries: [(grade, lowest percentage)]
+        self.components = [(name, float(top), float(weight)) for name, top, weight in components]
+        if not self.components:
+            raise PolicyError("A policy needs at least one component")
+        for name, top, weight in self.components:
+            if top <= 0 or weight < 0:
+                raise PolicyError(f"{name}: max must be positive and weight can't be negative")
+        self.total_weight = sum(weight for _, _, weight in self.components)
+        if self.total_weight <= 0:
+            raise PolicyError("The weights can't all be zero")
+        self.names = [name for name, _, _ in self.components]
+        self.max_marks = sum(top for _, top, _ in self.components)
+        # Each mark times its factor is its weighted share (factor 1.0 when weight == max, so no rounding)
+        self.factors = [weight / top for _, top, weight in self.components]
+
+        ladder = sorted(((float(low), grade) for grade, low in boundaries))
+        for low, grade in ladder:
+            if not 0 <= low <= 100:
+                raise PolicyError(f"{grade}: boundary must be between 0 and 100")
+        if len({low for low, _ in ladder}) != len(ladder):
+            raise PolicyError("Two grades have the same boundary")
+        self.boundaries = [(grade, low) for low, grade in reversed(ladder)]  # Highest first, as written
+        self.thresholds = [low for low, _ in ladder]  # Ascending, for bisect
+        self.grades = [fail] + [grade for _, grade in ladder]  # grades[i] is for i thresholds passed
+        self.fail = fail
+
+    @classmethod
+    def from_dict(cls, data):
+        try:
+            components = [(c["name"], c["max"], c.get("weight", c["max"])) for c in data["components"]]
+            boundaries = [(grade, low) for grade, low in data["boundaries"]]
+            return cls(components, boundaries, data.get("fail", "F"))
+        except (KeyError, TypeError, ValueError) as e:
+            raise PolicyError(f"Bad grading policy: {e}") from None
+
+    def to_dict(self):
+        whole = lambda x: int(x) if x.is_integer() else x  # Keep 20 as 20 rather than 20.0 in the file
+        return {"components": [{"name": n, "max": whole(t), "weight": whole(w)} for n, t, w in self.components],
+                "boundaries": [[grade, whole(low)] for grade, low in self.boundaries], "fail": self.fail}
+
+    # Marks for the policy's components, read from a record's attributes or a dict's keys
+    def marks(self, record):
+        if isinstance(record, dict):
+            return [record[name] for name in self.names]
+        return [getattr(record, name) for name in self.names]
+
+    # Rows of marks for many records of the same kind
+    def mark_rows(self, records):
+        if not records:
+            return []
+        get = (itemgetter if isinstance(records[0], dict) else attrgetter)(*self.names)
+        if len(self.names) == 1:
+            return [(mark,) for mark in map(get, records)]  # A single name gives the value, not a tuple
+        return list(map(get, records))
+
+    def percentage(self, marks):
+        return sum(mark * factor for mark, factor in zip(marks, self.factors)) / self.total_weight * 100
+
+    def grade(self, percentage):
+        return self.grades[bisect_right(self.thresholds, percentage)]
+
+    # Percentages for many rows of marks (one row per student, one column per component)
+    def percentages(self, rows):
+        if len(rows) > NUMPY_ROWS and optional_numpy() is not None:
+            return (numpy.asarray(rows, dtype=float) @ numpy.asarray(self.factors)) / self.total_weight * 100
+        total, factors = self.total_weight, self.factors
+        if all(factor == 1.0 for factor in factors):
+            return [sum(row) / total * 100 for row in rows]  # Weights equal to max marks: plain totals
+        return [sum(map(mul, row, factors)) / total * 100 for row in rows]
+
+    # Grades for a whole column of percentages in one pass
+    def grade_column(self, percentages):
+        if len(percentages) > NUMPY_ROWS and optional_numpy() is not None:
+            indexes = numpy.searchsorted(self.thresholds, percentages, side="right")
+            return [self.grades[i] for i in indexes.tolist()]
+        thresholds, grades = self.thresholds, self.grades
+        return [grades[bisect_right(thresholds, p)] for p in percentages]
+
+    # (percentages, grades) for a list of records
+    def grade_all(self, records):
+        percentages = self.percentages(self.mark_rows(records))
+        return list(percentages), self.grade_column(percentages)
+
+
+# Read a policy file, or return `default` if there isn't one
+def load_policy(path, default=None):
+    if not os.path.exists(path):
+        if default is None:
+            raise PolicyError(f"No grading policy at {path}")
+        return default
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise PolicyError(f"Can't read {path}: {e}") from None
+    return GradingPolicy.from_dict(data)
+
+
+def save_policy(path, policy):
+    with open(path, "w") as f:
+        json.dump(policy.to_dict(), f, indent=2)
@@ -0,0 +1,224 @@
+import getpass
+import json
+import os
+import socket
+from collections import deque
+
+from roster_file import FileLock
+from student import Student
+
+# Undo/redo for roster edits. Each add, delete or update is a small command
+# object holding only the record(s) it touched - never a copy of the roster -
+# and knows how to apply and revert itself. Records are found again by
+# student code, so undo still works after the roster has been sorted.
+#
+# History keeps the last HISTORY_LIMIT commands. With a path it also keeps
+# an append-only journal (one JSON line per do/undo/redo) next to the data
+# file, so the history survives a restart; the journal is rewritten from
+# the current stacks whenever it gets much longer than they are.
+#
+# The data file is shared, so each user on each machine gets their own
+# journal (journal_path) - replaying one person's undo against someone
+# else's commands would undo the wrong thing. Appends and rewrites hold the
+# journal's FileLock and the file is opened afresh for each entry, so an
+# entry is never appended to a journal that another copy of the app has
+# already replaced.
+
+HISTORY_LIMIT = 100
+
+
+class HistoryError(Exception):
+    """An undo or redo that no longer matches the roster (it was changed some other way)."""
+
+
+# "<data file>.<user>-<machine>.history"
+def journal_path(data_path):
+    try:
+        user = getpass.getuser()
+    except (KeyError, OSError):  # No login name (e.g. some services and containers)
+        user = 'user'
+    owner = ''.join(c if c.isalnum() or c in '._-' else '_' for c in f"{user}-{socket.gethostname()}")
+    return f"{data_path}.{owner}.history"
+
+
+def find(students, code):
+    for i, student in enumerate(students):
+        if student.code == code:
+            return i
+    return -1
+
+
+class AddCommand:
+    kind = 'add'
+    __slots__ = ('index', 'student')
+
+    def __init__(self, index, student):
+        self.index = index
+        self.student = student
+
+    def apply(self, students):
+        if find(students, self.student.code) >= 0:
+            raise HistoryError(f"Student {self.student.code} already exists")
+        students.insert(min(self.index, len(students)), self.student)
+
+    def revert(self, students):
+        i = find(students, self.student.code)
+        if i < 0 or students[i] != self.student:
+            raise HistoryError(f"Student {self.student.code} has changed since")
+        del students[i]
+
+    def describe(self):
+        return f"{self.kind} {self.student.name} ({self.student.code})"
+
+    def to_dict(self):
+        return {'kind': self.kind, 'index': self.index, 'student': self.student.astuple()}
+
+
+class DeleteCommand(AddCommand):
+    kind = 'delete'
+    __slots__ = ()
+
+    apply, revert = AddCommand.revert, AddCommand.apply
+
+
+class UpdateCommand:
+    kind = 'update'
+    __slots__ = ('index', 'before', 'after')
+
+    def __init__(self, index, before, after):
+        self.index = index
+        self.before = before
+        self.after = after
+
+    @staticmethod
+    def replace(students, old, new):
+        i = find(students, old.code)
+        if i < 0 or students[i] != old:
+            raise HistoryError(f"Student {old.code} has changed since")
+        students[i] = new
+
+    def apply(self, students):
+        self.replace(students, self.before, self.after)
+
+    def revert(self, students):
+        self.replace(students, self.after, self.before)
+
+    def describe(self):
+        return f"update {self.after.name} ({self.after.code})"
+
+    def to_dict(self):
+        return {'kind': self.kind, 'index': self.index, 'before': self.before.astuple(),
+                'after': self.after.astuple()}
+
+
+def command_from_dict(data):
+    if data['kind'] == 'update':
+        return UpdateCommand(data['index'], Student(*data['before']), Student(*data['after']))
+    command = {'add': AddCommand, 'delete': DeleteCommand}[data['kind']]
+    return command(data['index'], Student(*data['student']))
+
+
+class History:
+    """Bounded undo/redo stacks of commands, optionally journaled to `path`."""
+
+    def __init__(self, path=None, limit=HISTORY_LIMIT):
+        self.path = path
+        self.limit = limit
+        self.undo_stack = deque(maxlen=limit)
+        self.redo_stack = []
+        self.lock = FileLock(path) if path else None
+        self.lines = 0
+        if path:
+            with self.lock.held():
+                self.load()
+
+    # Carry out `command` on the roster and remember it
+    def do(self, command, students):
+        command.apply(students)
+        self.push(command)
+        self.write({'do': command.to_dict()})
+
+    def push(self, command):
+        self.undo_stack.append(command)
+        self.redo_stack.clear()
+
+    # Revert the last command; returns it, or None if there is nothing to undo
+    def undo(self, students):
+        if not self.undo_stack:
+            return None
+        command = self.undo_stack[-1]
+        try:
+            command.revert(students)
+        except HistoryError:
+            self.undo_stack.pop()  # Can't ever be undone now, don't offer it again
+            self.write({'drop': 'undo'})
+            raise
+        self.redo_stack.append(self.undo_stack.pop())
+        self.write({'undo': True})
+        return command
+
+    def redo(self, students):
+        if not self.redo_stack:
+            return None
+        command = self.redo_stack[-1]
+        try:
+            command.apply(students)
+        except HistoryError:
+            self.redo_stack.pop()
+            self.write({'drop': 'redo'})
+            raise
+        self.undo_stack.append(self.redo_stack.pop())
+        self.write({'redo': True})
+        return command
+
+    def can_undo(self):
+        return bool(self.undo_stack)
+
+    def can_redo(self):
+        return bool(self.redo_stack)
+
+    # Rebuild the stacks from the journal (the roster itself is already saved in the data file)
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    self.lines += 1
+                    entry = json.loads(line)
+                    if 'do' in entry:
+                        self.push(command_from_dict(entry['do']))
+                    elif 'undo' in entry and self.undo_stack:
+                        self.redo_stack.append(self.undo_stack.pop())
+                    elif 'redo' in entry and self.redo_stack:
+                        self.undo_stack.append(self.redo_stack.pop())
+                    elif entry.get('drop') == 'undo' and self.undo_stack:
+                        self.undo_stack.pop()
+                    elif entry.get('drop') == 'redo' and self.redo_stack:
+                        self.redo_stack.pop()
+        except (ValueError, KeyError, TypeError, IndexError):
+            pass  # A damaged journal only loses history, keep whatever was read
+        if self.lines > 4 * self.limit:
+            self.compact()
+
+    # Rewrite the journal with just the commands still on the stacks
+    def compact(self):
+        entries = [{'do': command.to_dict()} for command in self.undo_stack]
+        entries += [{'do': command.to_dict()} for command in reversed(self.redo_stack)]
+        entries += [{'undo': True}] * len(self.redo_stack)  # Moves them back onto the redo stack, in order
+        temp = self.path + '.tmp'
+        with open(temp, 'w') as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + '\n')
+        os.replace(temp, self.path)
+        self.lines = len(entries)
+
+    def write(self, entry):
+        if self.path is None:
+            return
+        with self.lock.held():
+            with open(self.path, 'a') as journal:
+                journal.write(json.dumps(entry) + '\n')
+            self.lines += 1
+            if self.lines > 4 * self.limit:
+                self.compact()
@@ -0,0 +1,179 @@
+import argparse
+import os
+import shutil
+import sys
+
+from student import FIELDS, Student, read_students
+from student_grading import PolicyError, load_student_policy
+
+# Compare or merge two student files (this week's against last week's, or
+# two markers' copies). The smaller file is read into a dict keyed by
+# student code and the larger one is streamed past it, so both jobs take
+# one pass over each file and only the smaller file (plus the larger file's
+# student codes, to catch repeats) is ever held in memory.
+# Differences are produced one at a time and the merged file is written as
+# it goes.
+#
+# Usage: python roster_diff.py diff OLD NEW
+#        python roster_diff.py merge OURS THEIRS -o OUTPUT [--rule ours|theirs|max|mean]
+
+# What to keep when a student is in both files with different details
+RULES = {
+    'ours': "the first file's record",
+    'theirs': "the second file's record",
+    'max': "the higher of each mark",
+    'mean': "the average of each mark (rounded up)",
+}
+
+
+# Students in a file one at a time; bad lines go into `problems` as (path, line number, message)
+def stream_students(path, problems=None):
+    skipped = []
+    for _, student in read_students(path, skipped):
+        yield student
+    if problems is not None:
+        problems.extend((path, number, message) for number, message in skipped)
+
+
+def index_students(path, problems=None):
+    index = {}
+    for student in stream_students(path, problems):
+        if student.code in index:
+            if problems is not None:
+                problems.append((path, None, f"Student {student.code} appears more than once, using the first"))
+            continue
+        index[student.code] = student
+    return index
+
+
+# (a, b) for every code in either file, None on the side where it's missing.
+# Pairs come in the larger file's order, then the codes only the smaller file has.
+def join(path_a, path_b, problems=None):
+    a_smaller = os.path.getsize(path_a) < os.path.getsize(path_b)
+    small, large = (path_a, path_b) if a_smaller else (path_b, path_a)
+    index = index_students(small, problems)
+    seen = set()  # Just the codes, so repeats in the streamed file are caught too
+    for student in stream_students(large, problems):
+        if student.code in seen:
+            if problems is not None:
+                problems.append((large, None, f"Student {student.code} appears more than once, using the first"))
+            continue
+        seen.add(student.code)
+        other = index.pop(student.code, None)
+        yield (other, student) if a_smaller else (student, other)
+    for other in index.values():
+        yield (other, None) if a_smaller else (None, other)
+
+
+# ('added' | 'removed' | 'changed', old, new) for each student that differs between the files
+def diff_rosters(old_path, new_path, problems=None):
+    for old, new in join(old_path, new_path, problems):
+        if old is None:
+            yield 'added', None, new
+        elif new is None:
+            yield 'removed', old, None
+        elif old != new:
+            yield 'changed', old, new
+
+
+# One line describing a difference, with the grade change if there is one
+def describe_change(kind, old, new, policy):
+    student = new or old
+    grade = policy.grade(policy.percentage(policy.marks(student)))
+    if kind == 'added':
+        return f"+ {student.code} {student.name} (grade {grade})"
+    if kind == 'removed':
+        return f"- {student.code} {student.name} (grade {grade})"
+    changes = [f"{field} {getattr(old, field)} -> {getattr(new, field)}"
+               for field in FIELDS[1:] if getattr(old, field) != getattr(new, field)]
+    old_grade = policy.grade(policy.percentage(policy.marks(old)))
+    if old_grade != grade:
+        changes.append(f"grade {old_grade} -> {grade}")
+    return f"~ {student.code} {student.name}: " + ", ".join(changes)
+
+
+# The record to keep for a student whose details differ between the two files
+def merge_students(ours, theirs, rule):
+    if rule == 'ours':
+        return ours
+    if rule == 'theirs':
+        return theirs
+    if rule == 'max':
+        combine = max
+    elif rule == 'mean':
+        combine = lambda a, b: (a + b + 1) // 2
+    else:
+        raise ValueError(f"Unknown conflict rule: {rule}")
+    return Student(ours.code, ours.name, combine(ours.mark1, theirs.mark1), combine(ours.mark2, theirs.mark2),
+                   combine(ours.mark3, theirs.mark3), combine(ours.exam, theirs.exam))
+
+
+# Merge two files into `output` (which may be one of them). Returns counts of what happened.
+def merge_rosters(ours_path, theirs_path, output, rule='ours', problems=None):
+    if rule not in RULES:
+        raise ValueError(f"Unknown conflict rule: {rule}")
+    counts = {'same': 0, 'ours only': 0, 'theirs only': 0, 'conflicts': 0}
+    body = output + '.body'
+    written = 0
+    with open(body, 'w') as out:
+        for ours, theirs in join(ours_path, theirs_path, problems):
+            if theirs is None:
+                student = ours
+                counts['ours only'] += 1
+            elif ours is None:
+                student = theirs
+                counts['theirs only'] += 1
+            elif ours == theirs:
+                student = ours
+                counts['same'] += 1
+            else:
+                student = merge_students(ours, theirs, rule)
+                counts['conflicts'] += 1
+            out.write(student.to_line() + "\n")
+            written += 1
+    # The count goes first, so it's written once the body is done
+    with open(output + '.tmp', 'w') as out, open(body, 'r') as src:
+        out.write(f"{written}\n")
+        shutil.copyfileobj(src, out)
+    os.remove(body)
+    os.replace(output + '.tmp', output)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare or merge two student marks files.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    diff = commands.add_parser('diff', help="list added, removed and changed students")
+    diff.add_argument('old')
+    diff.add_argument('new')
+    merge = commands.add_parser('merge', help="merge two files into one")
+    merge.add_argument('ours')
+    merge.add_argument('theirs')
+    merge.add_argument('-o', '--output', required=True)
+    merge.add_argument('--rule', choices=list(RULES), default='ours',
+                       help="what to keep when a student differs: " +
+                            "; ".join(f"{rule}: {text}" for rule, text in RULES.items()))
+    args = parser.parse_args()
+
+    problems = []
+    try:
+        if args.command == 'diff':
+            policy = load_student_policy()
+            counts = {'added': 0, 'removed': 0, 'changed': 0}
+            for kind, old, new in diff_rosters(args.old, args.new, problems):
+                counts[kind] += 1
+                print(describe_change(kind, old, new, policy))
+            print(f"{counts['added']} added, {counts['removed']} removed, {counts['changed']} changed")
+        else:
+            counts = merge_rosters(args.ours, args.theirs, args.output, args.rule, problems)
+            print(f"Wrote {args.output}: " + ", ".join(f"{n} {kind}" for kind, n in counts.items()))
+    except (OSError, PolicyError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    for path, number, message in problems:
+        print(f"Skipped {path}" + (f" line {number}" if number else "") + f": {message}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
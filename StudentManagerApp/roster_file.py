@@ -0,0 +1,155 @@
+import os
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from student import read_students, save_lines
+
+# The shared student data file, for several people editing it at once.
+#
+# - changed() is one os.stat: the file's mtime and size are compared with
+#   what we last read or wrote, so it can be polled every couple of seconds.
+# - read() re-parses only lines it hasn't seen before; unchanged lines reuse
+#   the Student they were parsed into last time.
+# - sync() merges by student code: starting from the roster as we last
+#   synced it (base), our edits since then and the other people's edits in
+#   the file are combined, and written back if ours added anything. When the
+#   same student was changed on both sides, ours wins and it is reported.
+# - Reads and writes hold an advisory lock on "<file>.lock" (flock on
+#   POSIX, msvcrt on Windows), so two saves never interleave. The lock is a
+#   separate file because saves replace the data file.
+
+LOCK_TIMEOUT = 5.0  # Seconds to wait for another writer
+
+
+class LockTimeout(OSError):
+    """Someone else held the data file's lock for too long."""
+
+
+class FileLock:
+    def __init__(self, path, timeout=LOCK_TIMEOUT):
+        self.path = path + '.lock'
+        self.timeout = timeout
+
+    @contextmanager
+    def held(self, shared=False):
+        f = open(self.path, 'a+')
+        try:
+            deadline = time.monotonic() + self.timeout
+            while True:
+                try:
+                    if fcntl:
+                        fcntl.flock(f, (fcntl.LOCK_SH if shared else fcntl.LOCK_EX) | fcntl.LOCK_NB)
+                    else:
+                        f.seek(0)
+                        msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)  # Windows only has exclusive locks
+                    break
+                except OSError:
+                    if time.monotonic() > deadline:
+                        raise LockTimeout(f"{self.path} is locked by another user") from None
+                    time.sleep(0.05)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            f.close()
+
+
+# Three-way merge by student code. base: {code: Student} as last synced, ours: our roster now,
+# theirs: what is in the file now. Returns (merged roster, report) where report counts the
+# file's changes that were taken and lists conflicting codes.
+def reconcile(base, ours, theirs):
+    theirs_by_code = {student.code: student for student in theirs}
+    report = {'added': 0, 'removed': 0, 'updated': 0, 'conflicts': [], 'ours': False}
+    merged = []
+    our_codes = set()
+    for student in ours:
+        code = student.code
+        our_codes.add(code)
+        old = base.get(code)
+        new = theirs_by_code.get(code)
+        if old is not None and student == old:  # We haven't touched it: take theirs
+            if new is None:
+                report['removed'] += 1
+                continue
+            if new != old:
+                report['updated'] += 1
+            merged.append(new)
+        else:  # We added or changed it: keep ours
+            report['ours'] = True
+            if new != old and new != student:
+                report['conflicts'].append(code)
+            merged.append(student)
+    for student in theirs:
+        code = student.code
+        if code in our_codes:
+            continue
+        if code in base:  # We deleted it
+            report['ours'] = True
+            if student != base[code]:
+                report['conflicts'].append(code)  # ...and they changed it; the delete wins
+            continue
+        report['added'] += 1
+        merged.append(student)
+    return merged, report
+
+
+class RosterFile:
+    def __init__(self, path):
+        self.path = path
+        self.lock = FileLock(path)
+        self.signature = None  # (mtime_ns, size) of the file as we last read or wrote it
+        self.parsed = {}  # Line text -> Student, from the last read/write
+
+    def stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def changed(self):
+        return self.stat() != self.signature
+
+    # Students in the file and (line number, message) for lines that were skipped
+    def read(self):
+        with self.lock.held(shared=True):
+            return self.parse()
+
+    def parse(self):
+        problems = []
+        signature = self.stat()
+        lines = list(read_students(self.path, problems, self.parsed))
+        self.parsed = dict(lines)
+        self.signature = signature
+        return [student for _, student in lines], problems
+
+    def write(self, students):
+        lines = [student.to_line() for student in students]  # Formatted once, for the file and the cache
+        save_lines(self.path, lines)
+        self.parsed = dict(zip(lines, students))
+        self.signature = self.stat()
+
+    # Bring the file and our roster together: returns (merged roster, report, problems).
+    # With force, the merged roster is written even if the file already matches it.
+    def sync(self, ours, base, force=False):
+        with self.lock.held():
+            if self.changed() and self.stat() is not None:
+                theirs, problems = self.parse()
+                merged, report = reconcile(base, ours, theirs)
+            else:  # Unchanged (or deleted): nothing to take from the file
+                merged, problems = list(ours), []
+                report = {'added': 0, 'removed': 0, 'updated': 0, 'conflicts': [], 'ours': True}
+            if force or report['ours']:
+                self.write(merged)
+        return merged, report, problems
@@ -0,0 +1,23 @@
+import os
+
+from grading import GradingPolicy, PolicyError, load_policy
+from student import FIELDS
+
+# The Student Manager's grading policy, read from grading.json next to this
+# file (see grading.py for the format). Kept out of student_manager.py so the
+# command-line tools can grade students without loading the GUI.
+
+POLICY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'grading.json')
+
+# Used when there is no grading.json: coursework out of 3 x 20 plus an exam out of 100, A/B/C/D at 70/60/50/40%
+DEFAULT_POLICY = GradingPolicy([('mark1', 20, 20), ('mark2', 20, 20), ('mark3', 20, 20), ('exam', 100, 100)],
+                               [('A', 70), ('B', 60), ('C', 50), ('D', 40)])
+
+
+# The policy in `path` (DEFAULT_POLICY if there is no file); raises PolicyError if it can't be used
+def load_student_policy(path=POLICY_FILE):
+    policy = load_policy(path, DEFAULT_POLICY)
+    unknown = [name for name in policy.names if name not in FIELDS]
+    if unknown:
+        raise PolicyError(f"Unknown mark(s) in grading policy: {', '.join(unknown)}")
+    return policy
@@ -1,8 +1,16 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
+from tkinter import ttk, messagebox, simpledialog, filedialog
 import os
 from PIL import Image, ImageTk
 import pygame
+from student import Student, StudentError
+from roster_file import RosterFile
+from history import AddCommand, DeleteCommand, History, HistoryError, UpdateCommand, journal_path
+from roster_diff import RULES, describe_change, diff_rosters, merge_rosters
+from student_grading import DEFAULT_POLICY, POLICY_FILE, PolicyError, load_student_policy
+
+POLL_MS = 2000  # How often to check studentMarks.txt for other people's changes
+MAX_DIFF_LINES = 1000  # Differences listed on screen when comparing files
 
 class StudentManager:
     def __init__(self, root):
@@ -32,14 +40,23 @@ class StudentManager:
         # Initialize data - this will store all our student records
         self.students = []
         self.filename = "studentMarks.txt"  # File to save/load data
+        self.roster = RosterFile(self.filename)  # Shared file: locking, change polling and merging
+        self.synced = {}  # code -> Student as last read from / written to the file
+        self.policy_file = POLICY_FILE
+        self.policy = self.load_grading_policy() or DEFAULT_POLICY
         self.images = {}  # Dictionary to store images for the UI
         
         # Load images and data when the app starts
         self.load_images()
         self.load_data()
+        # Undo/redo of add, delete and update, kept next to the data file so it survives a restart
+        self.history = History(journal_path(self.filename))  # Ours alone, the data file is shared
         
         # Create the main GUI - build the user interface
         self.create_gui()
+        self.root.bind('<Control-z>', lambda e: self.undo())
+        self.root.bind('<Control-y>', lambda e: self.redo())
+        self.root.after(POLL_MS, self.check_for_changes)
     
     def init_sound(self):
         """Initialize pygame mixer for sound effects - for button clicks"""
@@ -111,25 +128,18 @@ class StudentManager:
         """Load student data from file - or create sample data if file doesn't exist"""
         try:
             if os.path.exists(self.filename):
-                with open(self.filename, 'r') as file:
-                    lines = file.readlines()
-                    for line in lines[1:]:  # Skip the first line (count)
-                        data = line.strip().split(',')
-                        if len(data) >= 6:
-                            student = {
-                                'code': int(data[0]),
-                                'name': data[1],
-                                'mark1': int(data[2]),
-                                'mark2': int(data[3]),
-                                'mark3': int(data[4]),
-                                'exam': int(data[5])
-                            }
-                            self.students.append(student)
+                self.students, problems = self.roster.read()
+                self.synced = {student.code: student for student in self.students}
+                if problems:
+                    # Bad lines are skipped rather than losing the whole file
+                    details = "\n".join(f"Line {number}: {message}" for number, message in problems[:10])
+                    more = f"\n...and {len(problems) - 10} more" if len(problems) > 10 else ""
+                    messagebox.showwarning("Warning", f"Skipped {len(problems)} invalid record(s):\n{details}{more}")
             else:
                 self.create_sample_data()  # Create sample data if no file exists
-        except Exception as e:
+        except (OSError, UnicodeDecodeError) as e:
+            # Don't overwrite a shared file we just couldn't read; the change check tries again
             messagebox.showerror("Error", f"Error loading data: {str(e)}")
-            self.create_sample_data()
     
     def create_sample_data(self):
         """Create sample data with some realistic student records"""
@@ -146,49 +156,75 @@ class StudentManager:
             [2983, "Les Ferdinand", 15, 17, 18, 92]
         ]
         
-        for data in sample_data:
-            student = {
-                'code': data[0],
-                'name': data[1],
-                'mark1': data[2],
-                'mark2': data[3],
-                'mark3': data[4],
-                'exam': data[5]
-            }
-            self.students.append(student)
+        self.students = [Student(*data) for data in sample_data]
         
         self.save_data()  # Save the sample data to file
     
     def save_data(self):
         """Save student data to file - called whenever data changes"""
         try:
-            with open(self.filename, 'w') as file:
-                file.write(f"{len(self.students)}\n")  # First line is count
-                for student in self.students:
-                    file.write(f"{student['code']},{student['name']},{student['mark1']},{student['mark2']},{student['mark3']},{student['exam']}\n")
+            # Other people's edits since we last synced are merged in, not overwritten
+            merged, report, _ = self.roster.sync(self.students, self.synced, force=True)
+            self.accept_merge(merged)
+            if report['added'] or report['removed'] or report['updated'] or report['conflicts']:
+                messagebox.showinfo("Merged", self.describe_merge(report))
         except Exception as e:
             messagebox.showerror("Error", f"Error saving data: {str(e)}")
     
+    def load_grading_policy(self):
+        """Read grading.json - returns None (after saying why) if it can't be used"""
+        try:
+            return load_student_policy(self.policy_file)
+        except PolicyError as e:
+            messagebox.showerror("Error", str(e))
+            return None
+    
+    def accept_merge(self, merged):
+        """Make a merged roster ours (same list object, so nothing holding it goes stale)"""
+        self.students[:] = merged
+        self.synced = {student.code: student for student in merged}
+    
+    def describe_merge(self, report):
+        text = (f"studentMarks.txt was changed by someone else: {report['added']} added, "
+                f"{report['updated']} updated, {report['removed']} removed.")
+        if report['conflicts']:
+            codes = ", ".join(str(code) for code in report['conflicts'])
+            text += f"\nYour changes were kept for: {codes}"
+        return text
+    
+    def check_for_changes(self):
+        """Poll the data file (one stat call) and merge in other people's edits"""
+        # Not while a dialog is open, so the list it was built from doesn't change under it
+        if self.roster.changed() and self.root.grab_current() is None:
+            try:
+                merged, report, _ = self.roster.sync(self.students, self.synced)
+            except (OSError, UnicodeDecodeError) as e:
+                print(f"Error reloading data: {e}")  # Try again next time
+            else:
+                self.accept_merge(merged)
+                if report['added'] or report['removed'] or report['updated']:
+                    self.view_all_students()
+                    self.results_text.insert(tk.END, "\n" + self.describe_merge(report) + "\n", 'highlight')
+                self.update_stats()
+        self.root.after(POLL_MS, self.check_for_changes)
+    
     def calculate_totals(self, student):
         """Calculate total coursework, overall percentage and grade for a student"""
-        coursework_total = student['mark1'] + student['mark2'] + student['mark3']
-        total_marks = coursework_total + student['exam']
-        percentage = (total_marks / 160) * 100  # 160 is max possible marks
-        
-        # Determine grade based on percentage
-        if percentage >= 70:
-            grade = 'A'
-        elif percentage >= 60:
-            grade = 'B'
-        elif percentage >= 50:
-            grade = 'C'
-        elif percentage >= 40:
-            grade = 'D'
-        else:
-            grade = 'F'
+        coursework_total = student.mark1 + student.mark2 + student.mark3
+        total_marks = coursework_total + student.exam
+        # Percentage and grade come from the grading policy (weights, max marks and boundaries)
+        percentage = self.policy.percentage(self.policy.marks(student))
+        grade = self.policy.grade(percentage)
         
         return coursework_total, total_marks, percentage, grade
     
+    def grade_cohort(self):
+        """Totals for every student at once - the whole grade column in one pass"""
+        percentages, grades = self.policy.grade_all(self.students)
+        return [(student.mark1 + student.mark2 + student.mark3,
+                 student.mark1 + student.mark2 + student.mark3 + student.exam, percentage, grade)
+                for student, percentage, grade in zip(self.students, percentages, grades)]
+    
     def create_glow_button(self, parent, text, command, color, width=300, height=50):
         """Create a button with glow effect and hover animation"""
         button_frame = tk.Frame(parent, bg=self.colors['dark_bg'])
@@ -285,7 +321,12 @@ class StudentManager:
             '#9b59b6',                # Sort - Purple
             '#1abc9c',                # Add - Teal
             '#d35400',                # Delete - Dark Orange
-            '#c0392b'                 # Update - Dark Red
+            '#c0392b',                # Update - Dark Red
+            '#7f8c8d',                # Grading policy - Gray
+            '#34495e',                # Undo - Slate
+            '#2980b9',                # Redo - Dark Blue
+            '#16a085',                # Compare - Dark Teal
+            '#8e44ad'                 # Merge - Dark Purple
         ]
         
         # Basic menu buttons section
@@ -318,7 +359,12 @@ class StudentManager:
             ("Sort Student Records", self.sort_students),
             ("Add Student Record", self.add_student),
             ("Delete Student Record", self.delete_student),
-            ("Update Student Record", self.update_student)
+            ("Update Student Record", self.update_student),
+            ("Reload Grading Policy", self.reload_grading_policy),
+            ("Undo (Ctrl+Z)", self.undo),
+            ("Redo (Ctrl+Y)", self.redo),
+            ("Compare With Another File", self.compare_with_file),
+            ("Merge Another File", self.merge_with_file)
         ]
         
         self.menu_buttons = []
@@ -399,16 +445,17 @@ class StudentManager:
         self.results_text.insert(tk.END, "• Sort student records\n")
         self.results_text.insert(tk.END, "• Add new students\n")
         self.results_text.insert(tk.END, "• Delete student records\n")
-        self.results_text.insert(tk.END, "• Update student information\n\n")
+        self.results_text.insert(tk.END, "• Update student information\n")
+        self.results_text.insert(tk.END, "• Compare or merge another marks file\n\n")
         self.results_text.insert(tk.END, f"Currently loaded: {len(self.students)} students\n", 'success')
     
     def clear_results(self):
         """Clear the results text area - like clearing a whiteboard"""
         self.results_text.delete(1.0, tk.END)
     
-    def display_student(self, student, show_header=False):
+    def display_student(self, student, show_header=False, totals=None):
         """Display a single student's information with colors based on grades"""
-        coursework_total, total_marks, percentage, grade = self.calculate_totals(student)
+        coursework_total, total_marks, percentage, grade = totals or self.calculate_totals(student)
         
         if show_header:
             # Display column headers for the first student
@@ -419,7 +466,7 @@ class StudentManager:
         # Color code based on grade - visual feedback for performance
         grade_color = 'success' if grade in ['A', 'B'] else 'warning' if grade in ['C', 'D'] else 'error'
         
-        line = f"{student['name']:<20} {student['code']:<8} {coursework_total:<12} {student['exam']:<8} {total_marks:<8} {percentage:<10.1f} "
+        line = f"{student.name:<20} {student.code:<8} {coursework_total:<12} {student.exam:<8} {total_marks:<8} {percentage:<10.1f} "
         self.results_text.insert(tk.END, line)
         self.results_text.insert(tk.END, f"{grade:<6}\n", grade_color)  # Grade with color
     
@@ -438,14 +485,14 @@ class StudentManager:
             return
         
         # Display header for the first student
-        self.display_student(self.students[0], show_header=True)
+        cohort = self.grade_cohort()
+        self.display_student(self.students[0], show_header=True, totals=cohort[0])
         
         # Display all students and calculate average
         total_percentage = 0
-        for student in self.students:
-            self.display_student(student)
-            _, _, percentage, _ = self.calculate_totals(student)
-            total_percentage += percentage
+        for student, totals in zip(self.students, cohort):
+            self.display_student(student, totals=totals)
+            total_percentage += totals[2]
         
         # Display summary statistics
         avg_percentage = total_percentage / len(self.students)
@@ -463,7 +510,7 @@ class StudentManager:
             return
         
         # Create a list of student names for selection
-        student_names = [f"{student['code']} - {student['name']}" for student in self.students]
+        student_names = [f"{student.code} - {student.name}" for student in self.students]
         
         selection = self.create_selection_dialog("Select Student", "Choose a student:", student_names)
         if selection is not None:
@@ -526,6 +573,25 @@ class StudentManager:
         for student in self.students:
             self.display_student(student)
     
+    def reload_grading_policy(self):
+        """Re-read grading.json and regrade everyone with it"""
+        policy = self.load_grading_policy()
+        if policy is None:
+            return  # Keep using the current policy
+        self.policy = policy
+        self.view_all_students()
+        
+        # Show the policy and how many students got each grade under it
+        counts = {}
+        for _, _, _, grade in self.grade_cohort():
+            counts[grade] = counts.get(grade, 0) + 1
+        self.results_text.insert(tk.END, "\nGRADING POLICY:\n", 'header')
+        marks = ", ".join(f"{name} /{max_mark:g} (weight {weight:g})" for name, max_mark, weight in policy.components)
+        self.results_text.insert(tk.END, f"Marks: {marks}\n")
+        for grade, low in policy.boundaries:
+            self.results_text.insert(tk.END, f"{grade:<3} >= {low:g}%   {counts.get(grade, 0)} student(s)\n")
+        self.results_text.insert(tk.END, f"{policy.fail:<3} below     {counts.get(policy.fail, 0)} student(s)\n")
+    
     def add_student(self):
         """Add a new student record - like enrolling a new student"""
         dialog = AddStudentDialog(self.root, self.colors, self.play_click_sound)
@@ -534,11 +600,11 @@ class StudentManager:
         if dialog.result:
             new_student = dialog.result
             # Check if student code already exists
-            if any(student['code'] == new_student['code'] for student in self.students):
+            if any(student.code == new_student.code for student in self.students):
                 messagebox.showerror("Error", "Student code already exists!")
                 return
             
-            self.students.append(new_student)
+            self.history.do(AddCommand(len(self.students), new_student), self.students)
             self.save_data()
             messagebox.showinfo("Success", "Student record added successfully!")
             self.view_all_students()  # Refresh the view
@@ -549,16 +615,16 @@ class StudentManager:
             messagebox.showwarning("Warning", "No student records available.")
             return
         
-        student_names = [f"{student['code']} - {student['name']}" for student in self.students]
+        student_names = [f"{student.code} - {student.name}" for student in self.students]
         
         selection = self.create_selection_dialog("Delete Student", "Select student to delete:", student_names)
         if selection is not None:
             student = self.students[selection]
             # Confirm deletion to prevent accidents
             confirm = messagebox.askyesno("Confirm Delete", 
-                                         f"Are you sure you want to delete {student['name']}?")
+                                         f"Are you sure you want to delete {student.name}?")
             if confirm:
-                del self.students[selection]
+                self.history.do(DeleteCommand(selection, student), self.students)
                 self.save_data()
                 messagebox.showinfo("Success", "Student record deleted successfully!")
                 self.view_all_students()
@@ -569,7 +635,7 @@ class StudentManager:
             messagebox.showwarning("Warning", "No student records available.")
             return
         
-        student_names = [f"{student['code']} - {student['name']}" for student in self.students]
+        student_names = [f"{student.code} - {student.name}" for student in self.students]
         
         selection = self.create_selection_dialog("Update Student", "Select student to update:", student_names)
         if selection is not None:
@@ -578,11 +644,96 @@ class StudentManager:
             self.root.wait_window(dialog.top)
             
             if dialog.result:
-                self.students[selection] = dialog.result
+                self.history.do(UpdateCommand(selection, student, dialog.result), self.students)
                 self.save_data()
                 messagebox.showinfo("Success", "Student record updated successfully!")
                 self.view_all_students()
     
+    def undo(self):
+        """Undo the last add, delete or update"""
+        self.step_history(self.history.undo, "Undone", "Nothing to undo.")
+    
+    def redo(self):
+        """Redo the last thing that was undone"""
+        self.step_history(self.history.redo, "Redone", "Nothing to redo.")
+    
+    def step_history(self, step, done_text, empty_text):
+        try:
+            command = step(self.students)
+        except HistoryError as e:
+            messagebox.showerror("Error", f"Can't do that any more: {e}")
+            return
+        if command is None:
+            messagebox.showinfo("History", empty_text)
+            return
+        self.save_data()
+        self.view_all_students()
+        self.results_text.insert(tk.END, f"\n{done_text}: {command.describe()}\n", 'highlight')
+    
+    def ask_roster_file(self, title):
+        return filedialog.askopenfilename(parent=self.root, title=title,
+                                          filetypes=[("Text files", "*.txt"), ("All files", "*.*")])
+    
+    def compare_with_file(self):
+        """Show what changed between another marks file (e.g. last week's) and ours"""
+        path = self.ask_roster_file("Compare with...")
+        if not path:
+            return
+        self.clear_results()
+        self.results_text.insert(tk.END, f"CHANGES FROM {os.path.basename(path)} TO {os.path.basename(self.filename)}\n", 'header')
+        self.results_text.insert(tk.END, "=" * 50 + "\n\n")
+        counts = {'added': 0, 'removed': 0, 'changed': 0}
+        problems = []
+        tags = {'added': 'success', 'removed': 'error', 'changed': 'warning'}
+        try:
+            # Streamed, so only the smaller file is held in memory; long lists are cut short on screen
+            for kind, old, new in diff_rosters(path, self.filename, problems):
+                counts[kind] += 1
+                if sum(counts.values()) <= MAX_DIFF_LINES:
+                    self.results_text.insert(tk.END, describe_change(kind, old, new, self.policy) + "\n", tags[kind])
+        except (OSError, UnicodeDecodeError) as e:
+            messagebox.showerror("Error", f"Error comparing files: {str(e)}")
+            return
+        shown = sum(counts.values())
+        if shown > MAX_DIFF_LINES:
+            self.results_text.insert(tk.END, f"...and {shown - MAX_DIFF_LINES} more\n")
+        if not shown:
+            self.results_text.insert(tk.END, "The files have the same students and marks.\n")
+        self.results_text.insert(tk.END, f"\n{counts['added']} added, {counts['removed']} removed, "
+                                         f"{counts['changed']} changed\n", 'highlight')
+        if problems:
+            self.results_text.insert(tk.END, f"{len(problems)} invalid line(s) were skipped\n", 'error')
+    
+    def merge_with_file(self):
+        """Merge another marks file into ours, choosing what happens to students in both"""
+        path = self.ask_roster_file("Merge from...")
+        if not path:
+            return
+        if os.path.abspath(path) == os.path.abspath(self.filename):
+            messagebox.showwarning("Warning", "That is the file already loaded.")
+            return
+        options = [f"{rule} - {text}" for rule, text in RULES.items()]
+        selection = self.create_selection_dialog("Merge Rule", "When a student is in both files, keep:", options)
+        if selection is None:
+            return
+        rule = list(RULES)[selection]
+        problems = []
+        try:
+            # Merged straight into the data file under its lock, then picked up like anyone else's edit
+            with self.roster.lock.held():
+                counts = merge_rosters(self.filename, path, self.filename, rule, problems)
+            merged, _, _ = self.roster.sync(self.students, self.synced)
+        except (OSError, UnicodeDecodeError) as e:
+            messagebox.showerror("Error", f"Error merging files: {str(e)}")
+            return
+        self.accept_merge(merged)
+        self.update_stats()
+        self.view_all_students()
+        self.results_text.insert(tk.END, f"\nMerged {os.path.basename(path)} ({rule}): {counts['theirs only']} added, "
+                                         f"{counts['conflicts']} in both with different marks\n", 'highlight')
+        if problems:
+            self.results_text.insert(tk.END, f"{len(problems)} invalid line(s) were skipped\n", 'error')
+    
     def create_selection_dialog(self, title, prompt, options):
         """Create a selection dialog with colors and icon - for choosing students"""
         dialog = CustomSelectionDialog(self.root, title, prompt, options, self.colors, self.play_click_sound)
@@ -795,40 +946,12 @@ class AddStudentDialog:
     def add_student(self):
         """Add the new student - validate input and create student record"""
         try:
-            # Get values from all input fields
-            code = int(self.entry_0.get())
-            name = self.entry_1.get()
-            mark1 = int(self.entry_2.get())
-            mark2 = int(self.entry_3.get())
-            mark3 = int(self.entry_4.get())
-            exam = int(self.entry_5.get())
-            
-            # Validate input ranges
-            if not (1000 <= code <= 9999):
-                messagebox.showerror("Error", "Student code must be between 1000 and 9999")
-                return
-            
-            if not (0 <= mark1 <= 20 and 0 <= mark2 <= 20 and 0 <= mark3 <= 20):
-                messagebox.showerror("Error", "Course marks must be between 0 and 20")
-                return
-            
-            if not (0 <= exam <= 100):
-                messagebox.showerror("Error", "Exam mark must be between 0 and 100")
-                return
-            
-            # Create the student dictionary
-            self.result = {
-                'code': code,
-                'name': name,
-                'mark1': mark1,
-                'mark2': mark2,
-                'mark3': mark3,
-                'exam': exam
-            }
-            
+            # Student checks every field and says what is wrong
+            self.result = Student(self.entry_0.get(), self.entry_1.get(), self.entry_2.get(),
+                                  self.entry_3.get(), self.entry_4.get(), self.entry_5.get())
             self.top.destroy()  # Close the dialog
-        except ValueError:
-            messagebox.showerror("Error", "Please enter valid numbers for all fields")
+        except StudentError as e:
+            messagebox.showerror("Error", str(e))
     
     def cancel(self):
         """Cancel the operation - close dialog without adding"""
@@ -840,12 +963,12 @@ class UpdateStudentDialog(AddStudentDialog):
         self.top.title("Update Student")  # Different title for update
         
         # Pre-fill fields with current values - so user can see what they're updating
-        self.entry_0.insert(0, str(student['code']))
-        self.entry_1.insert(0, student['name'])
-        self.entry_2.insert(0, str(student['mark1']))
-        self.entry_3.insert(0, str(student['mark2']))
-        self.entry_4.insert(0, str(student['mark3']))
-        self.entry_5.insert(0, str(student['exam']))
+        self.entry_0.insert(0, str(student.code))
+        self.entry_1.insert(0, student.name)
+        self.entry_2.insert(0, str(student.mark1))
+        self.entry_3.insert(0, str(student.mark2))
+        self.entry_4.insert(0, str(student.mark3))
+        self.entry_5.insert(0, str(student.exam))
         
         # Make code read-only - student code shouldn't change
         self.entry_0.config(state='readonly')
@@ -0,0 +1,378 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from bisect import bisect_left, insort
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from roster_file import LockTimeout, RosterFile
+from student import FIELDS, Student, StudentError
+from student_grading import PolicyError, load_student_policy
+
+# An optional local HTTP/JSON API over the same studentMarks.txt the Student
+# Manager edits, for other tools that need the roster without the GUI. It
+# runs on asyncio with HTTP/1.1 keep-alive.
+#
+#   GET    /health                          {"students": count}
+#   GET    /students?limit=&offset=         {"total": n, "students": [...]} in file order
+#   GET    /students/<code>                 one student
+#   GET    /top?limit=&offset=              highest percentage first
+#   GET    /bottom?limit=&offset=           lowest percentage first
+#   GET    /search?q=&limit=&offset=        a word of the name (or the code) starts with q, in code order
+#   POST   /students                        body: a whole student, 201 with the student
+#   PUT    /students/<code>                 body: the fields to change
+#   DELETE /students/<code>
+#
+# A student is {"code", "name", "mark1", "mark2", "mark3", "exam",
+# "percentage", "grade"} (percentage and grade from grading.json).
+#
+# The store keeps the roster in memory with a code -> student dict, a list
+# ranked by percentage and a sorted list of search keys (the code and each
+# word-start of the lowercased name, so "jo", "john cu" and "cur" all find
+# John Curry), so lookups, top/bottom pages and searches don't scan. Our own
+# edits move one student in the indexes instead of rebuilding them.
+# Writes go through RosterFile.sync, the same locked merge the GUI uses, so
+# a GUI open on the file picks them up and vice versa; the file is checked
+# at most every CHECK_SECONDS for other people's edits. Syncs run in an
+# executor one at a time, so a slow save or a held file lock only holds up
+# other writes, never reads.
+#
+# Usage: python student_service.py [--host H] [--port P] [--file studentMarks.txt]
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8766
+DEFAULT_FILE = 'studentMarks.txt'
+CHECK_SECONDS = 0.5
+MAX_PAGE = 1000
+MAX_BODY = 64 * 1024
+IDLE_TIMEOUT = 60  # Seconds before an idle keep-alive connection is closed
+REASONS = {200: 'OK', 201: 'Created', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           409: 'Conflict', 413: 'Payload Too Large', 503: 'Service Unavailable'}
+
+
+# What a student can be found by: the code and each word-start of the lowercased name
+def search_keys(student):
+    name = student.name.lower()
+    keys = [str(student.code), name]
+    space = name.find(' ')
+    while space >= 0:
+        keys.append(name[space + 1:])
+        space = name.find(' ', space + 1)
+    return keys
+
+
+def remove_sorted(items, item):
+    del items[bisect_left(items, item)]
+
+
+class RosterStore:
+    """The roster in memory, indexed by code, percentage and search key, kept in step with the file.
+
+    Methods that touch the file (pull, save) block, so the service runs them in
+    an executor, one at a time; everything else runs on the event loop.
+    """
+
+    def __init__(self, path, policy):
+        self.roster = RosterFile(path)
+        self.policy = policy
+        self.students = []
+        self.problems = []
+        if os.path.exists(path):
+            self.students, self.problems = self.roster.read()
+        self.checked = time.monotonic()
+        self.use(self.students, self.build_indexes(self.students))
+
+    # Fresh indexes for a whole roster: (by code, code -> (percentage, grade),
+    # [(percentage, code)] lowest first, [(search key, code)] sorted)
+    def build_indexes(self, students):
+        by_code = {student.code: student for student in students}  # Also the base for the next sync
+        percentages, grades = self.policy.grade_all(students)
+        results = {student.code: (percentage, grade)
+                   for student, percentage, grade in zip(students, percentages, grades)}
+        ranked = sorted((percentage, student.code) for student, percentage in zip(students, percentages))
+        keys = sorted((key, student.code) for student in students for key in search_keys(student))
+        return by_code, results, ranked, keys
+
+    def use(self, students, indexes):
+        self.students = students
+        self.by_code, self.results, self.ranked, self.keys = indexes
+
+    # One student into / out of the indexes, for our own edits
+    def index(self, student):
+        percentage = self.policy.percentage(self.policy.marks(student))
+        self.by_code[student.code] = student
+        self.results[student.code] = (percentage, self.policy.grade(percentage))
+        insort(self.ranked, (percentage, student.code))
+        for key in search_keys(student):
+            insort(self.keys, (key, student.code))
+
+    def unindex(self, student):
+        percentage, _ = self.results.pop(student.code)
+        del self.by_code[student.code]
+        remove_sorted(self.ranked, (percentage, student.code))
+        for key in search_keys(student):
+            remove_sorted(self.keys, (key, student.code))
+
+    def refresh_due(self):
+        return time.monotonic() - self.checked >= CHECK_SECONDS
+
+    # Blocking: other people's edits as (roster, indexes), or None if the file hasn't changed
+    def pull(self):
+        self.checked = time.monotonic()
+        if not self.roster.changed() or self.roster.stat() is None:
+            return None
+        merged, _, _ = self.roster.sync(self.students, self.by_code)
+        return merged, self.build_indexes(merged)
+
+    # Blocking: write our edited roster, merging with the file (same as a GUI save).
+    # Returns (roster, indexes) if other people's edits came in too, else (roster, None).
+    def save(self, students):
+        merged, report, _ = self.roster.sync(students, self.by_code, force=True)
+        self.checked = time.monotonic()
+        if report['added'] or report['removed'] or report['updated']:
+            return merged, self.build_indexes(merged)
+        return merged, None
+
+    # After a save: swap in the rebuilt indexes, or just move the one student that changed
+    def saved(self, result, old=None, new=None):
+        students, indexes = result
+        if indexes is not None:
+            self.use(students, indexes)
+            return
+        self.students = students
+        if old is not None:
+            self.unindex(old)
+        if new is not None:
+            self.index(new)
+
+    def describe(self, student):
+        percentage, grade = self.results[student.code]
+        data = dict(zip(FIELDS, student.astuple()))
+        data['percentage'] = round(percentage, 2)
+        data['grade'] = grade
+        return data
+
+    def page(self, students, limit, offset):
+        return {'total': len(students), 'students': [self.describe(s) for s in students[offset:offset + limit]]}
+
+    # Students with a search key starting with `query`, in code order
+    def search(self, query):
+        query = ' '.join(query.lower().split())
+        if not query:
+            return self.students
+        keys = self.keys
+        codes = set()
+        i = bisect_left(keys, (query,))
+        while i < len(keys) and keys[i][0].startswith(query):
+            codes.add(keys[i][1])
+            i += 1
+        return [self.by_code[code] for code in sorted(codes)]
+
+    # Our roster with a new student, or with `old` replaced or removed
+    def added(self, student):
+        return self.students + [student]
+
+    def replaced(self, old, new):
+        return [new if student.code == old.code else student for student in self.students]
+
+    def removed(self, old):
+        return [student for student in self.students if student.code != old.code]
+
+
+class StudentService:
+    """The request handlers, independent of the HTTP plumbing."""
+
+    def __init__(self, store):
+        self.store = store
+        self.writer = asyncio.Lock()  # One file sync at a time; reads never wait for it
+
+    # Run a blocking store method off the event loop
+    async def blocking(self, method, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, method, *args)
+
+    # Take in other people's edits in the background
+    async def refresh(self):
+        async with self.writer:
+            try:
+                result = await self.blocking(self.store.pull)
+            except (OSError, UnicodeDecodeError):
+                return  # Keep serving what we have, try again next time
+            if result is not None:
+                self.store.use(*result)
+
+    # (status, JSON-able body) for one request
+    async def handle(self, method, target, body=b''):
+        url = urlsplit(target)
+        path = url.path.rstrip('/') or '/'
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        store = self.store
+        if store.refresh_due() and not self.writer.locked():
+            store.checked = time.monotonic()  # Don't start another check while this one runs
+            asyncio.ensure_future(self.refresh())
+
+        if method in ('POST', 'PUT', 'DELETE'):
+            if path == '/students' and method == 'POST' or path.startswith('/students/') and method != 'POST':
+                return await self.write(method, path, body)
+            return 405, {'error': f'{method} not supported on {path}'}
+        if method != 'GET':
+            return 405, {'error': f'{method} not supported on {path}'}
+
+        if path.startswith('/students/'):
+            student = self.find(path)
+            if student is None:
+                return 404, {'error': f'no student {path[len("/students/"):]}'}
+            return 200, store.describe(student)
+        try:
+            limit = min(max(int(params.get('limit', 20)), 0), MAX_PAGE)
+            offset = max(int(params.get('offset', 0)), 0)
+        except ValueError:
+            return 400, {'error': 'limit and offset must be whole numbers'}
+        if path == '/health':
+            return 200, {'students': len(store.students)}
+        if path == '/students':
+            return 200, store.page(store.students, limit, offset)
+        if path in ('/top', '/bottom'):
+            ranked = store.ranked
+            if path == '/top':
+                end = max(len(ranked) - offset, 0)
+                page = ranked[max(end - limit, 0):end][::-1]
+            else:
+                page = ranked[offset:offset + limit]
+            return 200, {'total': len(ranked), 'students': [store.describe(store.by_code[code]) for _, code in page]}
+        if path == '/search':
+            return 200, store.page(store.search(params.get('q', '')), limit, offset)
+        return 404, {'error': f'unknown path {path}'}
+
+    def find(self, path):
+        code = unquote(path[len('/students/'):])
+        # isdigit() alone lets through characters like '²' that int() refuses
+        return self.store.by_code.get(int(code)) if code.isascii() and code.isdigit() else None
+
+    @staticmethod
+    def json_body(body):
+        try:
+            data = json.loads(body or b'{}')
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+
+    # Add, update or delete one student, saving it to the file off the event loop
+    async def write(self, method, path, body):
+        data = self.json_body(body) if method != 'DELETE' else {}
+        if data is None:
+            return 400, {'error': 'body must be a JSON object'}
+        store = self.store
+        async with self.writer:  # Looked up again once it's our turn, an earlier write may have changed it
+            try:
+                if method == 'POST':
+                    new = Student(*(data.get(field) for field in FIELDS))
+                    if new.code in store.by_code:
+                        return 409, {'error': f'student {new.code} already exists'}
+                    old, students = None, store.added(new)
+                else:
+                    old = self.find(path)
+                    if old is None:
+                        return 404, {'error': f'no student {path[len("/students/"):]}'}
+                    if method == 'PUT':
+                        values = dict(zip(FIELDS, old.astuple()))
+                        values.update((f, data[f]) for f in FIELDS[1:] if f in data)  # The code can't change
+                        new = Student(*(values[field] for field in FIELDS))
+                        students = store.replaced(old, new)
+                    else:
+                        new, students = None, store.removed(old)
+                store.saved(await self.blocking(store.save, students), old, new)
+            except StudentError as e:
+                return 400, {'error': str(e)}
+            except LockTimeout as e:
+                return 503, {'error': str(e)}
+            except (OSError, UnicodeDecodeError) as e:
+                return 503, {'error': f'could not save: {e}'}
+        if new is None:
+            return 200, {'deleted': old.code}
+        current = store.by_code.get(new.code)
+        if current is None:
+            return 409, {'error': f'student {new.code} was deleted by someone else'}
+        return (201 if method == 'POST' else 200), store.describe(current)
+
+
+def response(status, body, keep_alive):
+    data = json.dumps(body).encode('utf-8')
+    head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode('ascii') + data
+
+
+# One connection: answer requests until the client closes, asks to close or goes idle
+async def serve_connection(service, reader, writer):
+    try:
+        while True:
+            try:
+                head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), IDLE_TIMEOUT)
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError):
+                break
+            lines = head.decode('latin-1').split('\r\n')
+            parts = lines[0].split()
+            if len(parts) != 3:
+                writer.write(response(400, {'error': 'bad request line'}, False))
+                break
+            method, target, version = parts
+            headers = {}
+            for line in lines[1:]:
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip().lower()
+            length = headers.get('content-length', '0')
+            length = int(length) if length.isascii() and length.isdigit() else 0
+            if length > MAX_BODY:
+                writer.write(response(413, {'error': 'request body too large'}, False))
+                break
+            body = await reader.readexactly(length) if length else b''
+            connection = headers.get('connection', '')
+            keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+
+            status, reply = await service.handle(method, target, body)
+            writer.write(response(status, reply, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def start_server(service, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    return await asyncio.start_server(lambda r, w: serve_connection(service, r, w), host, port)
+
+
+async def serve(service, host, port):
+    server = await start_server(service, host, port)
+    address = server.sockets[0].getsockname()
+    print(f"Serving {len(service.store.students)} students on http://{address[0]}:{address[1]}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the student roster over HTTP/JSON.")
+    parser.add_argument('--file', default=DEFAULT_FILE, help="student marks file (default: studentMarks.txt)")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    try:
+        store = RosterStore(args.file, load_student_policy())
+    except (OSError, PolicyError) as e:
+        parser.exit(1, f"Error: {e}\n")
+    for number, message in store.problems:
+        print(f"Skipped line {number}: {message}")
+    try:
+        asyncio.run(serve(StudentService(store), args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,26 @@
+import time
+START_TIME = time.perf_counter()  # For the time-to-first-frame figure
 from tkinter import *   # Import tkinter for GUI
-from tkinter import messagebox  # Import messagebox 
 import random, math, os # It is used for when the file exists or not 
+from quiz_engine import QuizSession, CORRECT, RETRY, MAX_TIME_BONUS  # Headless quiz logic
+from question_bank import QuestionBank  # Precomputed rounds of questions
+from frame_stats import FrameMonitor  # Optional frame-time / after() lag instrumentation
+from tournament import Tournament  # Several players on one shared round
+# adaptive.py and leaderboard.py (which pull in sqlite3) are imported when first needed
 
 SOUNDS_AVAILABLE = False  # Flag to check if pygame is installed
 click_sound = correct_sound = wrong_sound = countdown_sound = None  # Sound variables
+pygame = None  # Imported by init_audio() once the title screen is up
 
-try:
-    import pygame
-    pygame.mixer.init()  # Initialize the mixer for sound
-    SOUNDS_AVAILABLE = True  # Enable sound support
-except:
-    pass  # Ignore errors if pygame not installed
+# Import pygame and start the mixer (slow, so it runs after the first frame)
+def init_audio():
+    global pygame, SOUNDS_AVAILABLE
+    try:
+        import pygame
+        pygame.mixer.init()  # Initialize the mixer for sound
+        SOUNDS_AVAILABLE = True  # Enable sound support
+    except:
+        pass  # Ignore errors if pygame not installed
 
 # Function to load a sound file
 def load_sound(path):
@@ -23,11 +33,22 @@ def load_sound(path):
     except:
         return None
 
-# Load sound effects
-click_sound = load_sound("click.wav")
-correct_sound = load_sound("correct.wav")
-wrong_sound = load_sound("wrong.wav")
-countdown_sound = load_sound("countdown.wav")
+# Load sound effects, one per startup step (play() skips sounds that aren't loaded yet)
+def load_click_sound():
+    global click_sound
+    click_sound = load_sound("click.wav")
+
+def load_correct_sound():
+    global correct_sound
+    correct_sound = load_sound("correct.wav")
+
+def load_wrong_sound():
+    global wrong_sound
+    wrong_sound = load_sound("wrong.wav")
+
+def load_countdown_sound():
+    global countdown_sound
+    countdown_sound = load_sound("countdown.wav")
 
 # Play a sound if available
 def play(snd):
@@ -50,21 +71,46 @@ def stop_countdown():
         if SOUNDS_AVAILABLE:
             countdown_sound.stop()
 
-root = Tk()  # Create main Tkinter window
-root.iconbitmap('math_quiz.ico') # For icon 
-root.title("Math Quiz")  # Set window title
-root.geometry("960x540")  # Set window size (big window)
-root.config(bg="#050317")  # Set background color
-root.resizable(False, False)  # Disable resizing
-
-# Variables
-score = 0
-question_num = 0
-difficulty = 0
-tries = 0
-first_number = 0
-second_number = 0
-answer = 0
+# The window is only built by main(), so importing this module never needs a display
+root = None
+bg = None
+
+# Rendering instrumentation, only set up when --stats or --stats-csv is given
+monitor = None
+show_stats_overlay = False
+stats_text = None  # Canvas text item for the overlay
+startup_timing = False  # --startup-time: print the startup figures and quit once ready
+
+# root.after(), measured by the monitor when instrumentation is on
+def schedule(ms, callback):
+    if monitor is not None:
+        return monitor.after(root, ms, callback)
+    return root.after(ms, callback)
+
+# The round being played (a QuizSession from quiz_engine)
+session = None
+
+# Where rounds come from, replaced in main() if --bank or --seed is given
+bank = QuestionBank()
+
+# Name typed on the menu screen, and the per-player stats file (opened on first use)
+player_name = "Player"
+stats_store = None
+leaderboard = None
+
+def get_stats_store():
+    global stats_store
+    if stats_store is None:
+        from adaptive import PlayerStatsStore
+        stats_store = PlayerStatsStore()
+    return stats_store
+
+def get_leaderboard():
+    global leaderboard
+    if leaderboard is None:
+        from leaderboard import Leaderboard
+        leaderboard = Leaderboard()
+    return leaderboard
 
 # Theme Colors
 theme = {}
@@ -77,21 +123,20 @@ theme["particle1"] = "#00f5ff"
 theme["particle2"] = "#ff4dd2"
 theme["particle3"] = "#7c5cff"
 
-# Background Canvas 
-bg = Canvas(root, width=960, height=540, bg=theme["bg"], highlightthickness=0)
-bg.pack(fill="both", expand=True)
-
 # Starfield 
 stars = []
-i = 0
-while i < 120:  # More stars to fill bigger window
-    x = random.randint(0, 960)
-    y = random.randint(0, 540)
-    size = random.randint(1, 3)
-    color = random.choice([theme["primary"], theme["accent"], "#bfefff", "#ffd6f0"])
-    star = bg.create_oval(x, y, x + size, y + size, fill=color, outline="")
-    stars.append({"id": star, "x": x, "y": y, "size": size, "speed": random.uniform(0.1, 0.3)})
-    i += 1
+
+# Create the stars on the background canvas
+def create_stars(count=120):
+    i = 0
+    while i < count:  # More stars to fill bigger window
+        x = random.randint(0, 960)
+        y = random.randint(0, 540)
+        size = random.randint(1, 3)
+        color = random.choice([theme["primary"], theme["accent"], "#bfefff", "#ffd6f0"])
+        star = bg.create_oval(x, y, x + size, y + size, fill=color, outline="")
+        stars.append({"id": star, "x": x, "y": y, "size": size, "speed": random.uniform(0.1, 0.3)})
+        i += 1
 
 # Function to move stars downward 
 def move_stars():
@@ -101,21 +146,22 @@ def move_stars():
             s["y"] = 0
             s["x"] = random.randint(0, 960)
         bg.coords(s["id"], s["x"], s["y"], s["x"] + s["size"], s["y"] + s["size"])
-    root.after(50, move_stars)
-
-move_stars()
+    schedule(50, move_stars)
 
 # Floating particles
 particles = []
-i = 0
-while i < 40:  # More particles for bigger window
-    x = random.randint(0, 960)
-    y = random.randint(0, 540)
-    size = random.randint(8, 14)
-    color = random.choice([theme["particle1"], theme["particle2"], theme["particle3"]])
-    p = bg.create_oval(x, y, x + size, y + size, fill=color, outline="")
-    particles.append({"id": p, "x": x, "y": y, "size": size, "dx": random.uniform(-0.3, 0.3), "dy": random.uniform(-0.3, 0.3)})
-    i += 1
+
+# Create the particles on the background canvas
+def create_particles(count=40):
+    i = 0
+    while i < count:  # More particles for bigger window
+        x = random.randint(0, 960)
+        y = random.randint(0, 540)
+        size = random.randint(8, 14)
+        color = random.choice([theme["particle1"], theme["particle2"], theme["particle3"]])
+        p = bg.create_oval(x, y, x + size, y + size, fill=color, outline="")
+        particles.append({"id": p, "x": x, "y": y, "size": size, "dx": random.uniform(-0.3, 0.3), "dy": random.uniform(-0.3, 0.3)})
+        i += 1
 
 # Animate particles 
 def move_particles():
@@ -127,16 +173,91 @@ def move_particles():
         if p["y"] < 0 or p["y"] + p["size"] > 540:
             p["dy"] = -p["dy"]
         bg.coords(p["id"], p["x"], p["y"], p["x"] + p["size"], p["y"] + p["size"])
-    root.after(50, move_particles)
-
-move_particles()
+    move_toasts()  # Toasts ride on the same frame tick as the particles
+    schedule(50, move_particles)
+
+# Toast messages (drawn on the canvas so they never block the event loop)
+toasts = []
+TOAST_FRAMES = 24  # How long a toast stays up (24 frames x 50 ms = 1.2 s)
+TOAST_FADE = 6  # Frames spent fading out at the end
+
+# Blend two hex colours, t = 0 gives c1 and t = 1 gives c2
+def blend(c1, c2, t):
+    r1, g1, b1 = int(c1[1:3], 16), int(c1[3:5], 16), int(c1[5:7], 16)
+    r2, g2, b2 = int(c2[1:3], 16), int(c2[3:5], 16), int(c2[5:7], 16)
+    return "#%02x%02x%02x" % (int(r1 + (r2 - r1) * t), int(g1 + (g2 - g1) * t), int(b1 + (b2 - b1) * t))
+
+# Show a short message at the top of the window that dismisses itself
+def show_toast(text, color):
+    for t in toasts:  # Only one toast at a time, the newest wins
+        bg.delete(t["box"])
+        bg.delete(t["text"])
+    toasts.clear()
+    y = 60
+    box = bg.create_rectangle(330, y - 22, 630, y + 22, fill=theme["card_bg"], outline=color, width=2)
+    label = bg.create_text(480, y, text=text, fill=color, font=("Consolas", 16, "bold"))
+    toasts.append({"box": box, "text": label, "color": color, "y": y, "life": TOAST_FRAMES})
+
+# Slide toasts up a little each frame and fade them out before removing
+def move_toasts():
+    for t in toasts[:]:
+        t["life"] -= 1
+        if t["life"] <= 0:
+            bg.delete(t["box"])
+            bg.delete(t["text"])
+            toasts.remove(t)
+            continue
+        if t["life"] < TOAST_FADE:
+            faded = blend(t["color"], theme["bg"], 1 - t["life"] / TOAST_FADE)
+            bg.itemconfig(t["text"], fill=faded)
+            bg.itemconfig(t["box"], outline=faded)
+        bg.move(t["box"], 0, -0.5)
+        bg.move(t["text"], 0, -0.5)
 
 # Helper function
 def clear():
+    stop_timer()
     for w in root.winfo_children():
         if w != bg:
             w.destroy()
 
+# Question timer: a progress bar on the question card, updated by the Tk after loop
+timer_bar = None  # (canvas, bar rectangle, seconds label) on the current question card
+timer_job = None  # id of the pending after() call
+
+def start_timer(card):
+    global timer_bar
+    bar = Canvas(card, width=440, height=10, bg="#091021", highlightthickness=0)
+    bar.pack(pady=(4, 0))
+    rect = bar.create_rectangle(0, 0, 440, 10, fill=theme["primary"], outline="")
+    label = Label(card, text="", fg=theme["muted"], bg=theme["card_bg"], font=("Consolas", 11))
+    label.pack()
+    timer_bar = (bar, rect, label)
+    tick_timer()
+
+def tick_timer():
+    global timer_job
+    timer_job = None
+    bar, rect, label = timer_bar
+    left = session.timer.fraction_left()  # Worked out from time.monotonic, so late ticks don't drift
+    bar.coords(rect, 0, 0, 440 * left, 10)
+    bar.itemconfig(rect, fill=theme["primary"] if left > 0.25 else theme["accent"])
+    label.config(text=f"{session.timer.remaining():.1f}s")
+    if session.timer.expired():
+        play(wrong_sound)
+        stop_countdown()
+        session.timeout()
+        show_toast(f"Time's up! It was {session.answer}", theme["accent"])
+        next_question()  # Auto-advance
+        return
+    timer_job = schedule(100, tick_timer)
+
+def stop_timer():
+    global timer_job
+    if timer_job is not None:
+        root.after_cancel(timer_job)
+        timer_job = None
+
 # Button with hover effect
 def glass_button(master, text, cmd, width=180, height=50):
     def wrapped_cmd():
@@ -165,57 +286,50 @@ def glass_entry(master):
     return e
 
 # --- GAME LOGIC ---
-def random_int():
-    if difficulty == 1:
-        return random.randint(1, 9)
-    elif difficulty == 2:
-        return random.randint(10, 99)
-    else:
-        return random.randint(100, 999)
+# (random_int, decide_operation and the scoring rules live in quiz_engine.py)
+def display_problem():
+    show_question(session.op)
 
-def decide_operation():
-    if random.random() < 0.5:
-        return "+"
-    else:
-        return "-"
+def start(level, name=None):
+    global session
+    set_player(name)
+    session = QuizSession(level, questions=bank.next_round(level))  # Whole round is built before it starts
+    next_question()
 
-def display_problem():
-    global first_number, second_number, answer, tries
-    first_number = random_int()
-    second_number = random_int()
-    op = decide_operation()
-    if op == "-" and first_number < second_number:
-        first_number, second_number = second_number, first_number
-    if op == "+":
-        answer = first_number + second_number
-    else:
-        answer = first_number - second_number
-    tries = 0
-    show_question(op)
-
-def start(level):
-    global difficulty, score, question_num
-    difficulty = level
-    score = 0
-    question_num = 0
+# Remember the name typed on the menu (kept as-is if none was given)
+def set_player(name):
+    global player_name
+    if name is not None:
+        player_name = name.strip() or "Player"
+
+# Adaptive mode: the level follows the player's speed and accuracy question by question
+def start_adaptive(name):
+    global session
+    from adaptive import start_adaptive_session
+    set_player(name)
+    session = start_adaptive_session(get_stats_store(), player_name)
     next_question()
 
 def next_question():
-    global question_num
-    question_num += 1
-    if question_num > 10:
-        display_results()
-    else:
+    if session.next_question():
         display_problem()
+    elif isinstance(session, Tournament):
+        display_tournament_results()
+    else:
+        display_results()
 
 def show_question(op):
     clear()
     card = Frame(root, bg=theme["card_bg"], bd=3, relief="ridge")
-    card.place(relx=0.5, rely=0.5, anchor="center", width=500, height=300)
-    Label(card, text=f"Question {question_num}/10   |   Score: {score}", fg=theme["accent"],
-          bg=theme["card_bg"], font=("Consolas", 14)).pack(pady=10)
-    Label(card, text=f"{first_number} {op} {second_number} = ?", fg=theme["primary"],
-          bg=theme["card_bg"], font=("Consolas", 26, "bold")).pack(pady=15)
+    card.place(relx=0.5, rely=0.5, anchor="center", width=500, height=340)
+    header = f"Question {session.question_num}/{session.total_questions}   |   Score: {session.score}"
+    if isinstance(session, Tournament):
+        header = f"{session.player.name[:14]}   |   " + header
+        show_scoreboard()
+    Label(card, text=header, fg=theme["accent"], bg=theme["card_bg"], font=("Consolas", 14)).pack(pady=10)
+    Label(card, text=f"{session.first_number} {op} {session.second_number} = ?", fg=theme["primary"],
+          bg=theme["card_bg"], font=("Consolas", 26, "bold")).pack(pady=(5, 5))
+    start_timer(card)
     entry = glass_entry(card)
     entry.pack(pady=10)
     entry.focus()
@@ -227,47 +341,76 @@ def show_question(op):
     play_countdown()
 
 def check(entry):
-    global score, tries
     try:
         ans = int(entry.get())
     except:
         play(wrong_sound)
-        messagebox.showerror("Error", "Enter numbers only!")
+        show_toast("Enter numbers only!", theme["accent"])
         entry.delete(0, END)
         return
-    if ans == answer:
+    result, points = session.check(ans)
+    if result == CORRECT:
         stop_countdown()
-        points = 10 if tries == 0 else 5
-        score += points
         play(correct_sound)
-        messagebox.showinfo("Correct!", f"+{points} points")
+        bonus = session.last_bonus
+        show_toast(f"Correct! +{points} points" + (f" (+{bonus} speed)" if bonus else ""), theme["primary"])
         next_question()
+    elif result == RETRY:
+        play(wrong_sound)
+        show_toast("Wrong - try again!", theme["accent"])
+        entry.delete(0, END)
     else:
-        tries += 1
         play(wrong_sound)
-        if tries == 1:
-            stop_countdown()
-            messagebox.showerror("Wrong", "Try again!")
-            play_countdown()
-            entry.delete(0, END)
-        else:
-            stop_countdown()
-            messagebox.showerror("Wrong", f"The correct answer was {answer}")
-            next_question()
+        stop_countdown()
+        show_toast(f"The correct answer was {session.answer}", theme["accent"])
+        next_question()
 
 def display_results():
     clear()
-    grade = "F"
-    if score >= 90: grade = "A+"
-    elif score >= 80: grade = "A"
-    elif score >= 70: grade = "B"
-    elif score >= 60: grade = "C"
-    elif score >= 50: grade = "D"
+    grade = session.grade()
     card = Frame(root, bg=theme["card_bg"], bd=3, relief="ridge")
-    card.place(relx=0.5, rely=0.5, anchor="center", width=450, height=220)
-    Label(card, text=f"Final Score: {score}/100\nGrade: {grade}", fg=theme["primary"],
-          bg=theme["card_bg"], font=("Consolas", 20, "bold")).pack(pady=30)
-    glass_button(card, "Play Again", start_screen).pack()
+    card.place(relx=0.5, rely=0.5, anchor="center", width=500, height=320)
+    Label(card, text=f"Final Score: {session.score}/{session.max_score}\nGrade: {grade}", fg=theme["primary"],
+          bg=theme["card_bg"], font=("Consolas", 20, "bold")).pack(pady=(30, 10))
+    from leaderboard import ADAPTIVE
+    adaptive = hasattr(session, "level")  # Only AdaptiveSession has a level
+    board = get_leaderboard()
+    usual = board.speed_stats(ADAPTIVE if adaptive else session.difficulty)  # Read before this round is logged
+    board.log_session(player_name, session, ADAPTIVE if adaptive else None)  # Saved in the background
+    speed = session.speed_stats()
+    text = f"Speed bonus: +{session.bonus} (max {MAX_TIME_BONUS * session.total_questions})\n" \
+           f"Avg {speed['mean']:.1f}s  |  median {speed['median']:.1f}s  |  fastest {speed['fastest']:.1f}s"
+    if usual["count"]:
+        text += f"\nUsual on this level: avg {usual['mean']:.1f}s, median {usual['median']:.1f}s"
+    Label(card, text=text, fg="white", bg=theme["card_bg"], font=("Consolas", 11)).pack(pady=(0, 8))
+    if adaptive:
+        stats = get_stats_store().record_session(player_name, session)
+        Label(card, text=f"{player_name}: level {stats['level']:.2f}  |  first try {stats['accuracy']:.0%}"
+                         f"  |  avg {stats['avg_time']:.1f}s",
+              fg=theme["muted"], bg=theme["card_bg"], font=("Consolas", 11)).pack(pady=(0, 10))
+    btn_frame = Frame(card, bg=theme["card_bg"])
+    btn_frame.pack()
+    glass_button(btn_frame, "Play Again", start_screen).pack(side=LEFT, padx=8)
+    glass_button(btn_frame, "Leaderboard", lambda: display_leaderboard(ADAPTIVE if adaptive else session.difficulty)).pack(side=LEFT, padx=8)
+
+# Top 10 scores for one difficulty, with buttons to switch between difficulties
+def display_leaderboard(difficulty=1):
+    from leaderboard import ADAPTIVE, DIFFICULTY_NAMES
+    clear()
+    stop_countdown()
+    card = Frame(root, bg=theme["card_bg"], bd=3, relief="ridge")
+    card.place(relx=0.5, rely=0.5, anchor="center", width=640, height=460)
+    Label(card, text=f"🏆 Leaderboard - {DIFFICULTY_NAMES[difficulty]}", fg=theme["accent"], bg=theme["card_bg"],
+          font=("Consolas", 20, "bold")).pack(pady=10)
+    tabs = Frame(card, bg=theme["card_bg"])
+    tabs.pack()
+    for level in (1, 2, 3, ADAPTIVE):
+        glass_button(tabs, DIFFICULTY_NAMES[level], lambda level=level: display_leaderboard(level)).pack(side=LEFT, padx=4)
+    rows = get_leaderboard().top(difficulty, 10)
+    lines = [f"{n:>2}. {player[:14]:<14} {score:>4}  {grade:<3}" for n, (player, score, grade, _) in enumerate(rows, 1)]
+    Label(card, text="\n".join(lines) or "No scores yet!", fg="white", bg=theme["card_bg"],
+          font=("Consolas", 13), justify="left").pack(pady=12)
+    glass_button(card, "Back", start_screen).pack(side=BOTTOM, pady=12)
 
 # --- NEW: INSTRUCTION SCREEN ---
 def display_instructions():
@@ -288,12 +431,88 @@ def display_menu():
     clear()
     stop_countdown()
     card = Frame(root, bg=theme["card_bg"], bd=3, relief="ridge")
-    card.place(relx=0.5, rely=0.5, anchor="center", width=400, height=300)
+    card.place(relx=0.5, rely=0.5, anchor="center", width=400, height=480)
     Label(card, text="Select Difficulty", fg=theme["accent"], bg=theme["card_bg"],
           font=("Consolas", 18, "bold")).pack(pady=20)
-    glass_button(card, "Easy", lambda: start(1), width=20).pack(pady=10)
-    glass_button(card, "Moderate", lambda: start(2), width=20).pack(pady=10)
-    glass_button(card, "Advanced", lambda: start(3), width=20).pack(pady=10)
+    glass_button(card, "Easy", lambda: start(1, name_entry.get()), width=20).pack(pady=10)
+    glass_button(card, "Moderate", lambda: start(2, name_entry.get()), width=20).pack(pady=10)
+    glass_button(card, "Advanced", lambda: start(3, name_entry.get()), width=20).pack(pady=10)
+    name_row = Frame(card, bg=theme["card_bg"])
+    name_row.pack(pady=(10, 0))
+    Label(name_row, text="Player:", fg=theme["muted"], bg=theme["card_bg"],
+          font=("Consolas", 12)).pack(side=LEFT, padx=4)
+    name_entry = glass_entry(name_row)
+    name_entry.config(width=12, font=("Consolas", 12))
+    name_entry.insert(0, player_name)
+    name_entry.pack(side=LEFT)
+    glass_button(card, "Adaptive", lambda: start_adaptive(name_entry.get()), width=20).pack(pady=10)
+    glass_button(card, "Tournament", display_tournament_setup, width=20).pack()
+
+# --- TOURNAMENT MODE ---
+SCOREBOARD_ROWS = 8  # Only the leaders are drawn, however many players there are
+
+# Enter the players (one per line), pick turns or head-to-head, then a difficulty
+def display_tournament_setup():
+    clear()
+    stop_countdown()
+    card = Frame(root, bg=theme["card_bg"], bd=3, relief="ridge")
+    card.place(relx=0.5, rely=0.5, anchor="center", width=520, height=460)
+    Label(card, text="🏁 Tournament", fg=theme["accent"], bg=theme["card_bg"],
+          font=("Consolas", 20, "bold")).pack(pady=10)
+    Label(card, text="Players (one per line):", fg=theme["muted"], bg=theme["card_bg"],
+          font=("Consolas", 12)).pack()
+    names = Text(card, width=30, height=8, font=("Consolas", 12), bg="#091021", fg="white",
+                 insertbackground="white", relief="ridge", bd=2)
+    names.insert("1.0", "Player 1\nPlayer 2")
+    names.pack(pady=6)
+    head_to_head = BooleanVar(value=False)
+    Checkbutton(card, text="Head-to-head (everyone answers each question in turn)", variable=head_to_head,
+                fg="white", bg=theme["card_bg"], selectcolor="#091021", activebackground=theme["card_bg"],
+                font=("Consolas", 10)).pack(pady=4)
+    levels = Frame(card, bg=theme["card_bg"])
+    levels.pack(pady=8)
+    for level, text in ((1, "Easy"), (2, "Moderate"), (3, "Advanced")):
+        glass_button(levels, text, lambda level=level: start_tournament(names.get("1.0", END), level,
+                                                                        head_to_head.get())).pack(side=LEFT, padx=4)
+    glass_button(card, "Back", display_menu).pack(pady=6)
+
+def start_tournament(names_text, level, head_to_head):
+    global session
+    names = [line.strip() for line in names_text.splitlines() if line.strip()]
+    if not names:
+        show_toast("Add at least one player!", theme["accent"])
+        return
+    session = Tournament(names, level, bank.next_round(level), head_to_head)  # Everyone shares one round
+    next_question()
+
+# Running scoreboard beside the question card
+def show_scoreboard():
+    board = session.scoreboard()
+    lines = [f"{n:>2}. {p.name[:10]:<10}{p.score:>4}" for n, p in enumerate(board[:SCOREBOARD_ROWS], 1)]
+    if session.player not in board[:SCOREBOARD_ROWS]:
+        lines.append(f"{board.index(session.player) + 1:>2}. {session.player.name[:10]:<10}{session.player.score:>4}")
+    panel = Frame(root, bg=theme["card_bg"], bd=2, relief="ridge")
+    panel.place(x=850, rely=0.5, anchor="center", width=200, height=300)
+    Label(panel, text="Scoreboard", fg=theme["accent"], bg=theme["card_bg"],
+          font=("Consolas", 13, "bold")).pack(pady=6)
+    Label(panel, text="\n".join(lines), fg="white", bg=theme["card_bg"], font=("Consolas", 10),
+          justify="left").pack()
+
+def display_tournament_results():
+    clear()
+    board = session.scoreboard()
+    card = Frame(root, bg=theme["card_bg"], bd=3, relief="ridge")
+    card.place(relx=0.5, rely=0.5, anchor="center", width=560, height=470)
+    Label(card, text=f"🏆 {board[0].name} wins!", fg=theme["primary"], bg=theme["card_bg"],
+          font=("Consolas", 20, "bold")).pack(pady=10)
+    rows = Text(card, width=52, height=14, font=("Consolas", 11), bg=theme["card_bg"], fg="white",
+                relief="flat", bd=0)
+    rows.insert(END, f"{'#':>3} {'Player':<16}{'Score':>6}{'Bonus':>6}{'1st':>5}{'Time':>8}\n")
+    for n, p in enumerate(board, 1):  # Scrollable text, so a whole class fits
+        rows.insert(END, f"{n:>3} {p.name[:16]:<16}{p.score:>6}{p.bonus:>6}{p.first_tries:>5}{p.time:>7.0f}s\n")
+    rows.config(state=DISABLED)
+    rows.pack(pady=6)
+    glass_button(card, "Play Again", start_screen).pack(pady=6)
 
 def start_screen():
     clear()
@@ -301,7 +520,107 @@ def start_screen():
     Label(root, text="Math Quiz", fg=theme["primary"], bg=theme["bg"],
           font=("Orbitron", 36, "bold")).place(relx=0.5, rely=0.3, anchor="center")
     glass_button(root, "Start Quiz", display_instructions).place(relx=0.5, rely=0.55, anchor="center")
-
-# Launch start screen
-start_screen()
-root.mainloop()
\ No newline at end of file
+    glass_button(root, "Leaderboard", display_leaderboard).place(relx=0.5, rely=0.67, anchor="center")
+
+# Finish any background saves before the window closes
+def on_close():
+    if leaderboard is not None:
+        leaderboard.close()
+    if monitor is not None:
+        monitor.close()
+    root.destroy()
+
+# Startup work that is not needed for the title screen, run one step per event-loop tick
+# after the first frame so the window stays responsive while it fills in
+def startup_steps():
+    return [lambda: create_stars(40), lambda: create_particles(20), lambda: create_stars(40),
+            lambda: create_particles(20), lambda: create_stars(40),
+            init_audio, load_click_sound, load_correct_sound, load_wrong_sound, load_countdown_sound]
+
+def run_startup(steps):
+    if not steps:
+        ready_ms = (time.perf_counter() - START_TIME) * 1000
+        if monitor is not None:
+            monitor.ready_ms = ready_ms
+        if monitor is not None or startup_timing:
+            print(f"Background and audio ready after {ready_ms:.0f} ms")
+        if startup_timing:
+            on_close()
+        return
+    steps.pop(0)()
+    root.after(1, run_startup, steps)
+
+# Once a second: summarise the monitor's samples, log them and refresh the overlay
+def update_stats():
+    global stats_text
+    summary = monitor.summary(len(bg.find_all()))
+    monitor.log(summary)
+    if show_stats_overlay:
+        if stats_text is None:
+            stats_text = bg.create_text(10, 10, anchor="nw", fill=theme["muted"], font=("Consolas", 9))
+        bg.itemconfig(stats_text, text=monitor.overlay_text(summary))
+        bg.tag_raise(stats_text)
+    root.after(1000, update_stats)
+
+# Time the animation and screen functions (wrapping the module globals, so every caller is measured)
+def install_monitor(csv_path, overlay):
+    global monitor, show_stats_overlay
+    monitor = FrameMonitor(csv_path)
+    show_stats_overlay = overlay
+    g = globals()
+    for name in ("move_stars", "move_particles", "clear", "show_question"):
+        g[name] = monitor.timed(name, g[name], frame=(name == "move_particles"))
+
+# Build the window, start the background animation and show the start screen
+def main():
+    global root, bg, bank, startup_timing
+    import argparse
+    parser = argparse.ArgumentParser(description="Math Quiz")
+    parser.add_argument("--bank", help="play rounds from a question bank file (see question_bank.py)")
+    parser.add_argument("--seed", type=int, help="seed for reproducible rounds")
+    parser.add_argument("--stats", action="store_true", help="show fps, frame-time and after() lag overlay")
+    parser.add_argument("--stats-csv", help="append the same figures to a CSV file once a second")
+    parser.add_argument("--startup-time", action="store_true",
+                        help="print the time to first frame and until everything is loaded, then quit")
+    args = parser.parse_args()
+    startup_timing = args.startup_time
+    if args.bank:
+        bank = QuestionBank.load(args.bank)
+    elif args.seed is not None:
+        bank = QuestionBank(args.seed)
+
+    root = Tk()  # Create main Tkinter window
+    try:
+        root.iconbitmap('math_quiz.ico') # For icon 
+    except:
+        pass  # .ico icons are not supported on every platform
+    root.title("Math Quiz")  # Set window title
+    root.geometry("960x540")  # Set window size (big window)
+    root.config(bg="#050317")  # Set background color
+    root.resizable(False, False)  # Disable resizing
+    root.protocol("WM_DELETE_WINDOW", on_close)
+
+    # Background Canvas 
+    bg = Canvas(root, width=960, height=540, bg=theme["bg"], highlightthickness=0)
+    bg.pack(fill="both", expand=True)
+    if args.stats or args.stats_csv:
+        install_monitor(args.stats_csv, args.stats)
+
+    # Launch start screen and get it on screen before anything else
+    start_screen()
+    root.update()
+    first_frame_ms = (time.perf_counter() - START_TIME) * 1000
+    if monitor is not None or startup_timing:
+        print(f"Time to first frame: {first_frame_ms:.0f} ms")
+    if monitor is not None:
+        monitor.first_frame_ms = first_frame_ms
+        root.after(1000, update_stats)
+
+    # Then start the animation (the loops pick up stars and particles as they are created)
+    move_stars()
+    move_particles()
+    root.after(1, run_startup, startup_steps())
+    root.mainloop()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
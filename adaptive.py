@@ -0,0 +1,129 @@
+import os, sqlite3, time  # sqlite3 keeps the per-player statistics on disk
+from quiz_engine import QuizSession
+
+# Adaptive difficulty for the Math Quiz. Instead of a fixed level 1, 2 or 3,
+# an AdaptiveSession keeps a continuous level between 1.0 and 3.0 and nudges
+# it after every question, based on how quickly and how accurately the player
+# answered. PlayerStatsStore remembers each player's level and rolling
+# averages between runs, plus every timed answer for later queries.
+
+MIN_LEVEL = 1.0
+MAX_LEVEL = 3.0
+SUBTRACTION_LEVEL = 1.3  # Below this level only addition questions are asked
+TARGET_SECONDS = 4.0  # A "fast" answer at level 1, scaled up with the level
+SMOOTHING = 0.1  # Weight of the newest answer in the rolling averages
+
+DEFAULT_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "quiz_stats.db")
+
+
+# Operand range for a continuous level, level 1 gives 1-9, 2 gives 10-99 and 3 gives 100-999
+def operand_range(level):
+    low = max(1, int(10 ** (level - 1)))
+    high = int(10 ** level) - 1
+    return low, high
+
+
+# Move the level up or down after a question, returns the new level
+def adjust_level(level, attempts, seconds, correct):
+    if correct and attempts == 1:
+        if seconds <= TARGET_SECONDS * level:
+            level += 0.15  # Fast and right first time
+        else:
+            level += 0.05  # Right first time but slow
+    elif correct:
+        level -= 0.1  # Needed a second try
+    else:
+        level -= 0.2  # Missed it twice
+    return min(MAX_LEVEL, max(MIN_LEVEL, level))
+
+
+class AdaptiveSession(QuizSession):
+    """A QuizSession whose operand ranges and operations follow the player's level."""
+
+    def __init__(self, level=MIN_LEVEL, rng=None):
+        super().__init__(int(level), rng)
+        self.level = level
+
+    def make_question(self):
+        low, high = operand_range(self.level)
+        first_number = self.rng.randint(low, high)
+        second_number = self.rng.randint(low, high)
+        op = "+"
+        if self.level >= SUBTRACTION_LEVEL and self.rng.random() < 0.5:
+            op = "-"
+        if op == "-" and first_number < second_number:
+            first_number, second_number = second_number, first_number
+        answer = first_number + second_number if op == "+" else first_number - second_number
+        return first_number, op, second_number, answer
+
+    def finish_question(self, points, bonus=0):
+        super().finish_question(points, bonus)
+        record = self.results[-1]
+        record["level"] = self.level
+        self.level = adjust_level(self.level, record["attempts"], record["time"], points > 0)
+        self.difficulty = int(self.level)  # Keep the plain 1-3 difficulty (and time limit) roughly in step
+
+
+class PlayerStatsStore:
+    """Per-player rolling statistics and answer timings in a small SQLite file."""
+
+    def __init__(self, path=DEFAULT_DB):
+        self.db = sqlite3.connect(path)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS players (
+                name TEXT PRIMARY KEY, level REAL, answered INTEGER,
+                accuracy REAL, avg_time REAL) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS answers (
+                player TEXT, session INTEGER, level REAL,
+                seconds REAL, attempts INTEGER, points INTEGER);
+            CREATE INDEX IF NOT EXISTS answers_by_player ON answers (player, session);
+        """)
+
+    def close(self):
+        self.db.close()
+
+    # Rolling stats for a player as a dict, or defaults for a new player
+    def player_stats(self, name):
+        row = self.db.execute("SELECT level, answered, accuracy, avg_time FROM players WHERE name = ?",
+                              (name,)).fetchone()
+        if row is None:
+            return {"name": name, "level": MIN_LEVEL, "answered": 0, "accuracy": 0.0, "avg_time": 0.0}
+        return {"name": name, "level": row[0], "answered": row[1], "accuracy": row[2], "avg_time": row[3]}
+
+    # Fold a finished session into the player's stats and store its answers
+    def record_session(self, name, session):
+        stats = self.player_stats(name)
+        accuracy, avg_time, answered = stats["accuracy"], stats["avg_time"], stats["answered"]
+        for record in session.results:
+            first_try = 1.0 if record["attempts"] == 1 and record["points"] else 0.0
+            if answered == 0:
+                accuracy, avg_time = first_try, record["time"]
+            else:
+                accuracy += SMOOTHING * (first_try - accuracy)
+                avg_time += SMOOTHING * (record["time"] - avg_time)
+            answered += 1
+        level = getattr(session, "level", stats["level"])
+        session_id = int(time.time() * 1000)
+        with self.db:  # One transaction per session
+            self.db.execute("INSERT OR REPLACE INTO players VALUES (?, ?, ?, ?, ?)",
+                            (name, level, answered, accuracy, avg_time))
+            self.db.executemany("INSERT INTO answers VALUES (?, ?, ?, ?, ?, ?)",
+                                [(name, session_id, r.get("level", session.difficulty), r["time"],
+                                  r["attempts"], r["points"]) for r in session.results])
+        return self.player_stats(name)
+
+    # The most recent answer times for a player, newest first
+    def timing_history(self, name, limit=100):
+        return self.db.execute("SELECT session, level, seconds, attempts, points FROM answers "
+                               "WHERE player = ? ORDER BY session DESC LIMIT ?", (name, limit)).fetchall()
+
+    # Average answer time and first-try rate for a player, grouped by whole level
+    def summary_by_level(self, name):
+        return self.db.execute("SELECT CAST(level AS INTEGER), COUNT(*), AVG(seconds), "
+                               "AVG(attempts = 1 AND points > 0) FROM answers WHERE player = ? "
+                               "GROUP BY CAST(level AS INTEGER)", (name,)).fetchall()
+
+
+# Start an adaptive session at the level the player reached last time
+def start_adaptive_session(store, name, rng=None):
+    return AdaptiveSession(store.player_stats(name)["level"], rng)
@@ -0,0 +1,112 @@
+import csv, time  # CSV log of the samples, perf_counter for the timings
+from collections import deque
+
+# Opt-in rendering instrumentation for the Math Quiz. A FrameMonitor wraps
+# the animation and screen functions to time them, wraps root.after() to see
+# how late each callback really fires, and once a second turns the recent
+# samples into frames per second, frame-time percentiles and callback lag.
+# The summary can be drawn on the canvas and/or appended to a CSV file so
+# rendering changes can be compared on real hardware.
+
+WINDOW = 200  # Samples kept per measurement (10 s of frames at 50 ms)
+CSV_FIELDS = ["time", "fps", "frame_p50_ms", "frame_p95_ms", "frame_p99_ms",
+              "lag_p50_ms", "lag_p95_ms", "lag_max_ms", "canvas_items", "first_frame_ms", "ready_ms"]
+
+
+# Value at percentile pct (0-100) of a sorted list
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+
+class FrameMonitor:
+    """Collects frame intervals, function run times and after() callback lag."""
+
+    def __init__(self, csv_path=None, clock=time.perf_counter):
+        self.clock = clock
+        self.frames = deque(maxlen=WINDOW)  # Seconds between frames
+        self.lags = deque(maxlen=WINDOW)  # Seconds an after() callback ran late
+        self.durations = {}  # Function name -> deque of run times in seconds
+        self.last_frame = None
+        self.first_frame_ms = None  # Startup figures, filled in by the app
+        self.ready_ms = None
+        self.csv_file = None
+        self.csv_writer = None
+        self.csv_fields = None  # Header is written with the first row, once every timed function is known
+        if csv_path:
+            self.csv_file = open(csv_path, "w", newline="", encoding="utf-8")
+            self.csv_writer = csv.writer(self.csv_file)
+
+    # Wrap a function so every call is timed, frame=True marks the call that draws a frame
+    def timed(self, name, func, frame=False):
+        samples = self.durations.setdefault(name, deque(maxlen=WINDOW))
+
+        def wrapper(*args, **kwargs):
+            start = self.clock()
+            if frame:
+                if self.last_frame is not None:
+                    self.frames.append(start - self.last_frame)
+                self.last_frame = start
+            try:
+                return func(*args, **kwargs)
+            finally:
+                samples.append(self.clock() - start)
+        wrapper.__name__ = getattr(func, "__name__", name)
+        return wrapper
+
+    # Drop-in for root.after(ms, callback) that records how late the callback fires
+    def after(self, root, ms, callback):
+        due = self.clock() + ms / 1000
+
+        def run():
+            self.lags.append(max(0.0, self.clock() - due))
+            callback()
+        return root.after(ms, run)
+
+    # Summary of the current window as a dict (times in milliseconds)
+    def summary(self, canvas_items=0):
+        frames = sorted(self.frames)
+        lags = sorted(self.lags)
+        mean_frame = sum(frames) / len(frames) if frames else 0.0
+        result = {"time": round(time.time(), 3),
+                  "fps": round(1 / mean_frame, 1) if mean_frame else 0.0,
+                  "frame_p50_ms": round(percentile(frames, 50) * 1000, 2),
+                  "frame_p95_ms": round(percentile(frames, 95) * 1000, 2),
+                  "frame_p99_ms": round(percentile(frames, 99) * 1000, 2),
+                  "lag_p50_ms": round(percentile(lags, 50) * 1000, 2),
+                  "lag_p95_ms": round(percentile(lags, 95) * 1000, 2),
+                  "lag_max_ms": round(lags[-1] * 1000, 2) if lags else 0.0,
+                  "canvas_items": canvas_items,
+                  "first_frame_ms": round(self.first_frame_ms or 0.0, 1),
+                  "ready_ms": round(self.ready_ms or 0.0, 1)}
+        for name, samples in self.durations.items():
+            result[f"{name}_ms"] = round(sum(samples) / len(samples) * 1000, 3) if samples else 0.0
+        return result
+
+    # Append one summary row to the CSV file (if one was given)
+    def log(self, summary):
+        if self.csv_writer is None:
+            return
+        if self.csv_fields is None:
+            self.csv_fields = CSV_FIELDS + [f"{name}_ms" for name in self.durations]
+            self.csv_writer.writerow(self.csv_fields)
+        self.csv_writer.writerow([summary.get(field, "") for field in self.csv_fields])
+        self.csv_file.flush()
+
+    # Short text for the on-screen overlay
+    def overlay_text(self, summary):
+        text = (f"{summary['fps']:.0f} fps  frame p50/95/99 {summary['frame_p50_ms']:.0f}/"
+                f"{summary['frame_p95_ms']:.0f}/{summary['frame_p99_ms']:.0f} ms\n"
+                f"after() lag p50/95/max {summary['lag_p50_ms']:.1f}/{summary['lag_p95_ms']:.1f}/"
+                f"{summary['lag_max_ms']:.1f} ms  items {summary['canvas_items']}\n"
+                f"first frame {summary['first_frame_ms']:.0f} ms  ready {summary['ready_ms']:.0f} ms")
+        for name in self.durations:
+            text += f"\n{name} {summary[f'{name}_ms']:.2f} ms"
+        return text
+
+    def close(self):
+        if self.csv_file is not None:
+            self.csv_file.close()
+            self.csv_file = None
+            self.csv_writer = None
@@ -0,0 +1,94 @@
+import os, queue, sqlite3, threading, time  # sqlite3 store written from a background thread
+from quiz_engine import speed_stats
+
+# Session history and high scores for the Math Quiz. Every finished round is
+# queued to a background writer thread, so saving never blocks the GUI, and
+# the table is indexed by (difficulty, score) so a top-N query only has to
+# read the first few rows of the index, however long the history gets.
+
+DEFAULT_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "quiz_history.db")
+ADAPTIVE = 0  # Difficulty value stored for adaptive rounds
+DIFFICULTY_NAMES = {ADAPTIVE: "Adaptive", 1: "Easy", 2: "Moderate", 3: "Advanced"}
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS sessions (
+        id INTEGER PRIMARY KEY, player TEXT, played_at REAL, difficulty INTEGER,
+        score INTEGER, grade TEXT, times TEXT, attempts TEXT);
+    CREATE INDEX IF NOT EXISTS sessions_top ON sessions (difficulty, score DESC, played_at);
+    CREATE INDEX IF NOT EXISTS sessions_player ON sessions (player, id);
+    CREATE INDEX IF NOT EXISTS sessions_recent ON sessions (difficulty, played_at);
+"""
+
+
+# Turn a finished QuizSession into a row for the sessions table
+def session_row(player, session, difficulty=None, played_at=None):
+    if difficulty is None:
+        difficulty = session.difficulty
+    times = ",".join(f"{r['time']:.2f}" for r in session.results)  # Compact text, one value per question
+    attempts = "".join(str(r["attempts"]) for r in session.results)
+    return (player, played_at or time.time(), difficulty, session.score, session.grade(), times, attempts)
+
+
+class Leaderboard:
+    """Appends sessions in the background and answers top-N queries."""
+
+    def __init__(self, path=DEFAULT_DB):
+        self.path = path
+        self.db = sqlite3.connect(path)  # Read connection, used by the GUI thread
+        self.db.execute("PRAGMA journal_mode=WAL")  # Readers never wait for the writer
+        self.db.executescript(SCHEMA)
+        self.pending = queue.Queue()
+        self.writer = threading.Thread(target=self._write_loop, daemon=True)
+        self.writer.start()
+
+    # Runs in the writer thread: save queued rows, batching whatever has piled up
+    def _write_loop(self):
+        db = sqlite3.connect(self.path)
+        while True:
+            row = self.pending.get()
+            rows = []
+            while row is not None:
+                rows.append(row)
+                try:
+                    row = self.pending.get_nowait()
+                except queue.Empty:
+                    break
+            if rows:
+                with db:
+                    db.executemany("INSERT INTO sessions (player, played_at, difficulty, score, grade, times, "
+                                   "attempts) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            for _ in rows:
+                self.pending.task_done()
+            if row is None:
+                self.pending.task_done()
+                db.close()
+                return
+
+    # Queue a finished session to be saved, returns straight away
+    def log_session(self, player, session, difficulty=None):
+        self.pending.put(session_row(player, session, difficulty))
+
+    # Wait until everything queued so far has been written
+    def flush(self):
+        self.pending.join()
+
+    # Best scores for a difficulty, highest first (earliest wins a tie)
+    def top(self, difficulty, limit=10):
+        return self.db.execute("SELECT player, score, grade, played_at FROM sessions WHERE difficulty = ? "
+                               "ORDER BY score DESC, played_at LIMIT ?", (difficulty, limit)).fetchall()
+
+    # Most recent sessions for one player
+    def history(self, player, limit=20):
+        return self.db.execute("SELECT played_at, difficulty, score, grade, times, attempts FROM sessions "
+                               "WHERE player = ? ORDER BY id DESC LIMIT ?", (player, limit)).fetchall()
+
+    # Answer-time statistics for a difficulty over its most recent sessions
+    def speed_stats(self, difficulty, sessions=200):
+        rows = self.db.execute("SELECT times FROM sessions WHERE difficulty = ? ORDER BY played_at DESC LIMIT ?",
+                               (difficulty, sessions)).fetchall()
+        return speed_stats([float(t) for (times,) in rows if times for t in times.split(",")])
+
+    def close(self):
+        self.pending.put(None)
+        self.writer.join()
+        self.db.close()
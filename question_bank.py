@@ -0,0 +1,105 @@
+import json, random  # JSON for bank files, random for the seeded generator
+from quiz_engine import QUESTIONS_PER_ROUND, make_question
+
+# Precomputed question banks for the Math Quiz. A bank holds whole rounds of
+# questions for one or more difficulty levels, generated up front from a seed,
+# so rounds are reproducible and no questions are built while the player is
+# answering. Banks can be saved to and loaded from a JSON file.
+
+
+# The key used to spot duplicates, 3 + 4 and 4 + 3 count as the same question
+def question_key(question):
+    first_number, op, second_number, _ = question
+    if op == "+" and first_number > second_number:
+        first_number, second_number = second_number, first_number
+    return first_number, op, second_number
+
+
+# Generate one round of questions with no duplicates
+def generate_round(difficulty, rng=random, questions=QUESTIONS_PER_ROUND):
+    round_questions = []
+    seen = set()
+    attempts = 0
+    while len(round_questions) < questions:
+        question = make_question(difficulty, rng)  # Subtraction is already swapped to stay non-negative
+        key = question_key(question)
+        attempts += 1
+        if key in seen and attempts < questions * 100:
+            continue  # Duplicate, draw again (give up after lots of tries so tiny ranges still finish)
+        seen.add(key)
+        round_questions.append(question)
+    return round_questions
+
+
+class QuestionBank:
+    """Rounds of precomputed questions, grouped by difficulty level."""
+
+    def __init__(self, seed=None):
+        self.seed = seed
+        self.rounds = {}  # difficulty -> list of rounds
+        self.positions = {}  # difficulty -> index of the next round to hand out
+        self.rngs = {}  # difficulty -> generator, kept so each new round carries on the same sequence
+        self.loaded = set()  # Difficulties whose rounds came from a file, replayed in a cycle
+
+    # Random generator for a difficulty, seeded so the same seed gives the same bank
+    def _rng(self, difficulty):
+        rng = self.rngs.get(difficulty)
+        if rng is None:
+            rng = random.Random() if self.seed is None else random.Random(f"{self.seed}:{difficulty}")
+            self.rngs[difficulty] = rng
+        return rng
+
+    # Add `count` rounds for each difficulty level
+    def generate(self, difficulties=(1, 2, 3), count=1, questions=QUESTIONS_PER_ROUND):
+        for difficulty in difficulties:
+            rng = self._rng(difficulty)
+            rounds = self.rounds.setdefault(difficulty, [])
+            for _ in range(count):
+                rounds.append(generate_round(difficulty, rng, questions))
+        return self
+
+    # Hand out the next round for a difficulty. Rounds loaded from a file are cycled through;
+    # otherwise a new round is generated each time the bank runs out, so no round repeats
+    def next_round(self, difficulty):
+        rounds = self.rounds.setdefault(difficulty, [])
+        position = self.positions.get(difficulty, 0)
+        if position >= len(rounds):
+            if difficulty in self.loaded:
+                position %= len(rounds)
+            else:
+                self.generate((difficulty,), 1)
+        self.positions[difficulty] = position + 1
+        return list(rounds[position])
+
+    def save(self, path):
+        data = {"seed": self.seed,
+                "rounds": {str(d): [[list(q) for q in r] for r in rounds] for d, rounds in self.rounds.items()}}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        bank = cls(data.get("seed"))
+        for difficulty, rounds in data["rounds"].items():
+            if rounds:
+                bank.rounds[int(difficulty)] = [[tuple(q) for q in r] for r in rounds]
+                bank.loaded.add(int(difficulty))
+        return bank
+
+
+# Build a bank file from the command line, e.g.
+#   python question_bank.py --seed 42 --rounds 100 -o bank.json
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Generate a Math Quiz question bank")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--rounds", type=int, default=10, help="rounds per difficulty")
+    parser.add_argument("--difficulty", type=int, choices=[1, 2, 3], action="append",
+                        help="difficulty level (repeat for several, default all)")
+    parser.add_argument("-o", "--output", default="question_bank.json")
+    args = parser.parse_args()
+    bank = QuestionBank(args.seed).generate(args.difficulty or (1, 2, 3), args.rounds)
+    bank.save(args.output)
+    print(f"Wrote {sum(len(r) for r in bank.rounds.values())} rounds to {args.output}")
@@ -0,0 +1,228 @@
+import os, random, time  # Random numbers for the questions, clock for answer times
+from grading import GradingPolicy, PolicyError, load_policy
+
+# Headless quiz logic for the Math Quiz. Nothing in here touches tkinter, so a
+# QuizSession can be driven by Task_1.py, by a test script, or by a simulator
+# that plays thousands of rounds without a display.
+
+QUESTIONS_PER_ROUND = 10
+FIRST_TRY_POINTS = 10
+SECOND_TRY_POINTS = 5
+
+# Operand range for each difficulty level
+RANGES = {1: (1, 9), 2: (10, 99), 3: (100, 999)}
+
+# Seconds allowed per question, and the most bonus points an instant answer can earn
+TIME_LIMITS = {1: 15.0, 2: 25.0, 3: 40.0}
+MAX_TIME_BONUS = 5
+
+# Possible results of checking an answer
+CORRECT = "correct"  # Right answer, move on
+RETRY = "retry"  # Wrong on the first try, same question again
+WRONG = "wrong"  # Wrong on the second try, move on
+TIMEOUT = "timeout"  # Ran out of time, move on
+
+
+# Pick a number in the range for the difficulty level
+def random_int(difficulty, rng=random):
+    low, high = RANGES.get(difficulty, RANGES[3])
+    return rng.randint(low, high)
+
+
+# Randomly choose addition or subtraction
+def decide_operation(rng=random):
+    if rng.random() < 0.5:
+        return "+"
+    else:
+        return "-"
+
+
+# Build one question as (first_number, op, second_number, answer)
+def make_question(difficulty, rng=random):
+    first_number = random_int(difficulty, rng)
+    second_number = random_int(difficulty, rng)
+    op = decide_operation(rng)
+    if op == "-" and first_number < second_number:
+        first_number, second_number = second_number, first_number  # Keep answers non-negative
+    if op == "+":
+        answer = first_number + second_number
+    else:
+        answer = first_number - second_number
+    return first_number, op, second_number, answer
+
+
+# Grade boundaries for a score out of 100; quiz_grading.json next to this file overrides them
+DEFAULT_POLICY = GradingPolicy([("score", 100, 100)], [("A+", 90), ("A", 80), ("B", 70), ("C", 60), ("D", 50)])
+POLICY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "quiz_grading.json")
+grading_policy = None
+
+
+# The quiz's grading policy, read from POLICY_FILE the first time it's needed
+def quiz_policy():
+    global grading_policy
+    if grading_policy is None:
+        try:
+            grading_policy = load_policy(POLICY_FILE, DEFAULT_POLICY)
+        except PolicyError as e:
+            print(f"{e}, using the default grades")
+            grading_policy = DEFAULT_POLICY
+    return grading_policy
+
+
+# Turn a score out of 100 into a grade
+def grade_for(score):
+    return quiz_policy().grade(score)
+
+
+class CountdownTimer:
+    """Time left on one question, measured with a monotonic clock."""
+
+    def __init__(self, seconds, clock=time.monotonic):
+        self.seconds = seconds
+        self.clock = clock
+        self.started = clock()
+
+    def elapsed(self):
+        return self.clock() - self.started
+
+    def remaining(self):
+        return max(0.0, self.seconds - self.elapsed())
+
+    # 1.0 at the start of the question, 0.0 when time is up
+    def fraction_left(self):
+        return self.remaining() / self.seconds
+
+    def expired(self):
+        return self.elapsed() >= self.seconds
+
+
+# Count, mean, median, 90th percentile and fastest of a list of answer times
+def speed_stats(times):
+    times = sorted(times)
+    if not times:
+        return {"count": 0, "mean": 0.0, "median": 0.0, "p90": 0.0, "fastest": 0.0}
+    return {"count": len(times), "mean": sum(times) / len(times), "median": times[len(times) // 2],
+            "p90": times[min(len(times) - 1, int(len(times) * 0.9))], "fastest": times[0]}
+
+
+class QuizSession:
+    """One 10-question round: question generation, answer checking and scoring.
+
+    Pass `questions` (a list of (first_number, op, second_number, answer), e.g.
+    a round from question_bank) to play precomputed questions; otherwise each
+    question is generated when it is reached.
+
+    Every finished question is appended to `results` as a dict with the
+    question, the number of attempts, the seconds taken, the points given and
+    any time bonus. Each question runs against a CountdownTimer; time bonuses
+    are kept in `bonus`, separate from the 100-point score used for grading.
+    """
+
+    def __init__(self, difficulty, rng=None, questions=None):
+        self.difficulty = difficulty
+        self.rng = rng if rng is not None else random.Random()
+        self.questions = questions
+        self.total_questions = len(questions) if questions else QUESTIONS_PER_ROUND
+        self.score = 0
+        self.question_num = 0
+        self.tries = 0
+        self.first_number = 0
+        self.second_number = 0
+        self.op = "+"
+        self.answer = 0
+        self.results = []
+        self.bonus = 0
+        self.last_bonus = 0  # Time bonus given for the most recent correct answer
+        self.clock = time.monotonic  # Swap for a fake clock in simulations
+        self.timer = None
+
+    @property
+    def finished(self):
+        return self.question_num > self.total_questions
+
+    @property
+    def time_limit(self):
+        return TIME_LIMITS.get(self.difficulty, TIME_LIMITS[3])
+
+    @property
+    def max_score(self):
+        return self.total_questions * FIRST_TRY_POINTS
+
+    # Move on to the next question, returns False once the round is over
+    def next_question(self):
+        self.question_num += 1
+        if self.finished:
+            return False
+        if self.questions:
+            question = self.questions[self.question_num - 1]
+        else:
+            question = self.make_question()
+        self.first_number, self.op, self.second_number, self.answer = question
+        self.tries = 0
+        self.timer = CountdownTimer(self.time_limit, self.clock)
+        return True
+
+    # Build a question on demand, subclasses can change how questions are picked
+    def make_question(self):
+        return make_question(self.difficulty, self.rng)
+
+    # Record how the current question went
+    def finish_question(self, points, bonus=0):
+        self.results.append({"question": (self.first_number, self.op, self.second_number, self.answer),
+                             "attempts": self.tries + 1, "time": self.timer.elapsed(),
+                             "points": points, "bonus": bonus})
+
+    # Check an answer, returns (result, points) where result is CORRECT, RETRY or WRONG
+    def check(self, ans):
+        if ans == self.answer:
+            points = FIRST_TRY_POINTS if self.tries == 0 else SECOND_TRY_POINTS
+            bonus = 0
+            if self.tries == 0:
+                bonus = round(MAX_TIME_BONUS * self.timer.fraction_left())  # Quicker answers earn more
+            self.score += points
+            self.bonus += bonus
+            self.last_bonus = bonus
+            self.finish_question(points, bonus)
+            return CORRECT, points
+        if self.tries == 0:
+            self.tries = 1
+            return RETRY, 0
+        self.finish_question(0)
+        self.tries += 1
+        return WRONG, 0
+
+    # The timer ran out before the question was answered
+    def timeout(self):
+        self.finish_question(0)
+        return TIMEOUT, 0
+
+    def speed_stats(self):
+        return speed_stats([r["time"] for r in self.results])
+
+    def grade(self):
+        return grade_for(self.score * 100 // self.max_score)
+
+
+# Play a whole round automatically, the player is right with probability `accuracy`
+def simulate_session(difficulty, rng, accuracy=0.8, questions=None):
+    session = QuizSession(difficulty, rng, questions)
+    while session.next_question():
+        while True:
+            guess = session.answer if rng.random() < accuracy else session.answer + 1
+            result, _ = session.check(guess)
+            if result != RETRY:
+                break
+    return session
+
+
+# Run lots of simulated rounds, e.g. python quiz_engine.py 10000
+if __name__ == "__main__":
+    import sys, time
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    rng = random.Random(0)
+    start = time.perf_counter()
+    total = 0
+    for n in range(count):
+        total += simulate_session(n % 3 + 1, rng).score
+    elapsed = time.perf_counter() - start
+    print(f"{count} sessions in {elapsed:.2f}s ({count / elapsed:.0f} sessions/s), average score {total / count:.1f}")
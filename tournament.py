@@ -0,0 +1,106 @@
+from quiz_engine import (CountdownTimer, TIME_LIMITS, FIRST_TRY_POINTS, SECOND_TRY_POINTS,
+                         MAX_TIME_BONUS, CORRECT, RETRY, WRONG, TIMEOUT)
+import time
+
+# Local tournament mode for the Math Quiz. Several players answer the same
+# precomputed round, either taking turns (each plays the whole round before
+# the next player starts) or head-to-head (every player answers question 1,
+# then question 2, ...). Only one copy of the questions is kept, and each
+# player is a small PlayerState, so a class of 30 costs next to nothing.
+#
+# A Tournament has the same question/answer interface as QuizSession
+# (next_question, check, timeout, timer, first_number, ...) so the quiz
+# screens in Task_1.py can play it unchanged.
+
+
+class PlayerState:
+    """Running totals for one tournament player."""
+    __slots__ = ("name", "score", "bonus", "first_tries", "time")
+
+    def __init__(self, name):
+        self.name = name
+        self.score = 0
+        self.bonus = 0
+        self.first_tries = 0
+        self.time = 0.0  # Total seconds spent answering
+
+
+class Tournament:
+    """N players on one shared round of questions."""
+
+    def __init__(self, names, difficulty, questions, head_to_head=False):
+        self.players = [PlayerState(name) for name in names]
+        self.difficulty = difficulty
+        self.questions = questions  # Shared by every player
+        self.head_to_head = head_to_head
+        self.turn = -1
+        self.player = None
+        self.question_num = 0
+        self.tries = 0
+        self.first_number = self.second_number = self.answer = 0
+        self.op = "+"
+        self.last_bonus = 0
+        self.clock = time.monotonic
+        self.timer = None
+
+    @property
+    def total_questions(self):
+        return len(self.questions)
+
+    @property
+    def max_score(self):
+        return self.total_questions * FIRST_TRY_POINTS
+
+    # Score of the player whose turn it is
+    @property
+    def score(self):
+        return self.player.score if self.player else 0
+
+    # Which player and which question a turn number refers to
+    def position(self, turn):
+        if self.head_to_head:
+            question_index, player_index = divmod(turn, len(self.players))
+        else:
+            player_index, question_index = divmod(turn, len(self.questions))
+        return player_index, question_index
+
+    # Move on to the next turn, returns False once every player has answered every question
+    def next_question(self):
+        self.turn += 1
+        if self.turn >= len(self.players) * len(self.questions):
+            self.player = None
+            return False
+        player_index, question_index = self.position(self.turn)
+        self.player = self.players[player_index]
+        self.question_num = question_index + 1
+        self.first_number, self.op, self.second_number, self.answer = self.questions[question_index]
+        self.tries = 0
+        self.timer = CountdownTimer(TIME_LIMITS.get(self.difficulty, TIME_LIMITS[3]), self.clock)
+        return True
+
+    # Same scoring as QuizSession: 10 first try, 5 second try, plus a time bonus on the first try
+    def check(self, ans):
+        player = self.player
+        if ans == self.answer:
+            points = FIRST_TRY_POINTS if self.tries == 0 else SECOND_TRY_POINTS
+            self.last_bonus = 0
+            if self.tries == 0:
+                self.last_bonus = round(MAX_TIME_BONUS * self.timer.fraction_left())
+                player.first_tries += 1
+            player.score += points
+            player.bonus += self.last_bonus
+            player.time += self.timer.elapsed()
+            return CORRECT, points
+        if self.tries == 0:
+            self.tries = 1
+            return RETRY, 0
+        player.time += self.timer.elapsed()
+        return WRONG, 0
+
+    def timeout(self):
+        self.player.time += self.timer.elapsed()
+        return TIMEOUT, 0
+
+    # Players ranked by score, then bonus, then the least time taken
+    def scoreboard(self):
+        return sorted(self.players, key=lambda p: (-p.score, -p.bonus, p.time))